@@ -0,0 +1,157 @@
+# Cheap pre-transcription gate for captured audio.
+# Works on the raw 16 kHz mono s16le PCM of a chunk and decides whether it is
+# worth sending to the transcriber: silent chunks, chunks with little
+# speech-like sound (music beds, noise) and near-repeats of a recent chunk
+# from the same stream (looping ads, holding slates) are skipped. Every
+# decision carries its metrics so the thresholds can be tuned from the logs.
+
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+import numpy as np
+
+FRAME = 512           # 32 ms at 16 kHz
+HOP = FRAME // 2
+FINGERPRINT_SMOOTH = 4  # frames summed per fingerprint step, for tolerance to misalignment
+SPEECH_BAND = (300, 3400)
+FINGERPRINT_BANDS = 16
+
+@dataclass
+class GateResult:
+    transcribe: bool
+    reason: str               # "ok", "silent", "non-speech" or "duplicate"
+    seconds: float
+    rms_dbfs: float
+    speech_ratio: float       # fraction of frames the VAD calls speech
+    flatness: float           # median spectral flatness of active frames (0 tonal .. 1 noise)
+    modulation_db: float      # spread of frame energy; speech rises and falls, beds do not
+    duplicate_similarity: float
+
+    def as_dict(self):
+        return asdict(self)
+
+def pcm_to_float(pcm):
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+
+class AudioGate:
+    """
+    silence_dbfs: chunks quieter than this overall are silent
+    min_speech_ratio: chunks with fewer speech frames than this are non-speech
+    max_flatness: frames flatter than this are noise, not voiced speech
+    min_modulation_db: chunks with steadier energy than this are non-speech
+    duplicate_similarity: band-energy correlation (~0 = unrelated, 1 = identical)
+    at or above which a chunk repeats one of the last `history` chunks
+    """
+
+    def __init__(self, sample_rate=16000, silence_dbfs=-50.0, min_speech_ratio=0.15,
+                 max_flatness=0.45, min_modulation_db=3.0, duplicate_similarity=0.8,
+                 history=8, enabled=True):
+        self.sample_rate = sample_rate
+        self.silence_dbfs = silence_dbfs
+        self.min_speech_ratio = min_speech_ratio
+        self.max_flatness = max_flatness
+        self.min_modulation_db = min_modulation_db
+        self.duplicate_similarity = duplicate_similarity
+        self.history = history
+        self.enabled = enabled
+
+        freqs = np.fft.rfftfreq(FRAME, 1.0 / sample_rate)
+        self._window = np.hanning(FRAME).astype(np.float32)
+        self._speech_bins = (freqs >= SPEECH_BAND[0]) & (freqs <= SPEECH_BAND[1])
+        edges = np.geomspace(SPEECH_BAND[0], 4000, FINGERPRINT_BANDS + 1)
+        self._band_of_bin = np.digitize(freqs, edges) - 1
+        self._band_bins = (self._band_of_bin >= 0) & (self._band_of_bin < FINGERPRINT_BANDS)
+        self._recent = {}
+        self._lock = threading.Lock()
+
+    # ─── FEATURES ─────────────────────────────────────────────────────────────
+    def _frames(self, samples):
+        """Half-overlapping frames, as a strided view"""
+        return np.lib.stride_tricks.sliding_window_view(samples, FRAME)[::HOP]
+
+    def _fingerprint(self, power):
+        """Coarse log band-energy map (steps x bands) and its normalized envelope"""
+        bands = np.zeros((len(power), FINGERPRINT_BANDS), dtype=np.float64)
+        np.add.at(bands.T, self._band_of_bin[self._band_bins], power[:, self._band_bins].T)
+        steps = len(bands) // FINGERPRINT_SMOOTH
+        bands = bands[:steps * FINGERPRINT_SMOOTH].reshape(steps, FINGERPRINT_SMOOTH, -1).sum(axis=1)
+        log_bands = np.log10(bands + 1e-10)
+        envelope = log_bands.mean(axis=1)
+        envelope = (envelope - envelope.mean()) / (envelope.std() + 1e-9)
+        return log_bands, envelope
+
+    def _similarity(self, current, previous):
+        """
+        Best correlation of the band-energy maps over the likeliest alignments
+        of the two chunks (about 0 for unrelated audio, 1 for a repeat)
+        """
+        bands, envelope = current
+        prev_bands, prev_envelope = previous
+        min_overlap = max(min(len(bands), len(prev_bands)) // 4, 8)
+        if len(bands) < min_overlap or len(prev_bands) < min_overlap:
+            return 0.0
+        # Chunks start at arbitrary points in a repeating ad, so align on the
+        # energy envelope first and only compare bits at the top few lags
+        corr = np.correlate(envelope, prev_envelope, mode="full")
+        lags = np.argsort(corr)[::-1][:3] - (len(prev_envelope) - 1)
+        best = 0.0
+        for lag in lags:
+            a = bands[max(lag, 0):]
+            b = prev_bands[max(-lag, 0):]
+            n = min(len(a), len(b))
+            if n < min_overlap:
+                continue
+            a = a[:n] - a[:n].mean(axis=0)
+            b = b[:n] - b[:n].mean(axis=0)
+            denom = np.sqrt(np.sum(a * a) * np.sum(b * b))
+            if denom > 0:
+                best = max(best, float(np.sum(a * b) / denom))
+        return best
+
+    # ─── DECISION ─────────────────────────────────────────────────────────────
+    def evaluate(self, pcm, key=None):
+        """Gate one chunk of PCM; key (e.g. the stream name) scopes duplicate history"""
+        samples = pcm_to_float(pcm)
+        seconds = len(samples) / self.sample_rate
+        rms = float(np.sqrt(np.mean(samples ** 2))) if len(samples) else 0.0
+        rms_dbfs = float(20 * np.log10(rms + 1e-10))
+        metrics = dict(seconds=round(seconds, 2), rms_dbfs=round(rms_dbfs, 1),
+                       speech_ratio=0.0, flatness=1.0, modulation_db=0.0,
+                       duplicate_similarity=0.0)
+
+        if len(samples) < FRAME * 8 or rms_dbfs < self.silence_dbfs:
+            return self._result("silent", metrics)
+
+        frames = self._frames(samples)
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2
+        frame_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        # Active frames: above the silence level and within 45 dB of the loudest
+        active = frame_db > max(self.silence_dbfs, frame_db.max() - 45)
+
+        speech_power = power[:, self._speech_bins] + 1e-12
+        flatness = np.exp(np.mean(np.log(speech_power), axis=1)) / np.mean(speech_power, axis=1)
+        band_ratio = speech_power.sum(axis=1) / (power.sum(axis=1) + 1e-12)
+        speech = active & (flatness < self.max_flatness) & (band_ratio > 0.5)
+
+        metrics["speech_ratio"] = round(float(speech.mean()), 3)
+        if active.any():
+            metrics["flatness"] = round(float(np.median(flatness[active])), 3)
+            metrics["modulation_db"] = round(float(np.std(frame_db[active])), 1)
+
+        fingerprint = self._fingerprint(power)
+        with self._lock:
+            recent = self._recent.setdefault(key, deque(maxlen=self.history))
+            similarity = max((self._similarity(fingerprint, prev) for prev in recent), default=0.0)
+            recent.append(fingerprint)
+        metrics["duplicate_similarity"] = round(similarity, 3)
+
+        if (metrics["speech_ratio"] < self.min_speech_ratio
+                or metrics["modulation_db"] < self.min_modulation_db):
+            return self._result("non-speech", metrics)
+        if similarity >= self.duplicate_similarity:
+            return self._result("duplicate", metrics)
+        return self._result("ok", metrics)
+
+    def _result(self, reason, metrics):
+        transcribe = reason == "ok" or not self.enabled
+        return GateResult(transcribe=transcribe, reason=reason, **metrics)
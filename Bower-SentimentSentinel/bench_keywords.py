@@ -0,0 +1,81 @@
+# Keyword matching benchmark: the original per-keyword substring loop versus
+# KeywordIndex, for growing keyword lists on a synthetic transcript.
+#
+# Example:
+#   python bench_keywords.py --sizes 10 1000 10000 --words 5000
+
+import argparse
+import random
+import string
+import time
+from keyword_index import KeywordIndex
+
+BASE_KEYWORDS = ["bullish", "bearish", "calls", "puts", "Google",
+                 "Tesla", "option chain", "strike price", "volume"]
+FILLER = ("the market is moving today and traders are watching the open with "
+          "some interest as rates and earnings come into focus again").split()
+
+def make_keywords(n, rng):
+    """The stock keywords plus random tickers, names and two-word phrases"""
+    keywords = list(BASE_KEYWORDS[:n])
+    seen = {k.lower() for k in keywords}
+    while len(keywords) < n:
+        kind = rng.random()
+        if kind < 0.4:
+            kw = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 5)))
+        elif kind < 0.8:
+            kw = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))).title()
+        else:
+            kw = " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8)))
+                          for _ in range(2))
+        if kw.lower() not in seen:
+            seen.add(kw.lower())
+            keywords.append(kw)
+    return keywords
+
+def make_transcript(keywords, n_words, rng, hit_rate=0.02):
+    words = []
+    for _ in range(n_words):
+        words.append(rng.choice(keywords) if rng.random() < hit_rate else rng.choice(FILLER))
+    return " ".join(words)
+
+def naive_match(text, keywords):
+    """The loop log_transcription_with_keywords used to run"""
+    return [kw for kw in keywords if kw.lower() in text.lower()]
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword matcher benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--words", type=int, default=5000, help="transcript length in words")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Transcript of {args.words} words, best of {args.repeat}")
+    print(f"{'keywords':>9}{'build ms':>10}{'naive ms':>11}{'index ms':>11}{'speedup':>9}"
+          f"{'naive hits':>12}{'index hits':>12}")
+    for n in args.sizes:
+        rng = random.Random(args.seed)
+        keywords = make_keywords(n, rng)
+        text = make_transcript(keywords, args.words, rng)
+
+        start = time.perf_counter()
+        index = KeywordIndex(keywords)
+        build = time.perf_counter() - start
+
+        naive_time, naive_hits = best_of(lambda: naive_match(text, keywords), args.repeat)
+        index_time, scan = best_of(lambda: index.scan(text), args.repeat)
+        # Naive hits include substrings inside other words; the index matches whole words
+        print(f"{n:>9}{build * 1000:>10.1f}{naive_time * 1000:>11.2f}{index_time * 1000:>11.2f}"
+              f"{naive_time / index_time:>8.1f}x{len(naive_hits):>12}{len(scan.counts):>12}")
+
+if __name__ == "__main__":
+    main()
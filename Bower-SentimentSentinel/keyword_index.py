@@ -0,0 +1,132 @@
+# One-pass keyword matcher for transcripts.
+# The keywords are folded into a character trie and emitted as a single
+# regular expression, so alternatives that share a prefix are tried once
+# and a transcript is scanned in one pass however many keywords there are.
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+@dataclass
+class KeywordHit:
+    keyword: str
+    start: int
+    end: int
+    context: str
+
+@dataclass
+class KeywordScan:
+    hits: list = field(default_factory=list)
+    counts: OrderedDict = field(default_factory=OrderedDict)
+
+    @property
+    def keywords(self):
+        """Matched keywords, in the order the index was built with"""
+        return list(self.counts)
+
+def _normalize(keyword):
+    # Phrases match across any run of whitespace, so "strike  price" == "strike price"
+    return " ".join(keyword.split())
+
+def _trie_pattern(node):
+    """Regex for a trie node; "" marks the end of a keyword"""
+    terminal = "" in node
+    branches = []
+    for char in sorted(k for k in node if k):
+        piece = r"\s+" if char == " " else re.escape(char)
+        branches.append(piece + _trie_pattern(node[char]))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if terminal:
+        # Optional continuation: greedy, so the longest keyword wins
+        return body + "?" if len(branches) == 1 and len(branches[0]) == 1 else "(?:" + body + ")?"
+    return body
+
+class KeywordIndex:
+    """
+    keywords: words, tickers or phrases; empty and duplicate entries are dropped
+    word_boundary: only match whole words/phrases ("puts" does not hit "inputs")
+    case_sensitive: match case exactly instead of case-insensitively
+    context: characters of surrounding text kept with each hit
+    Where keywords overlap, the longest match at a position wins and the
+    shorter keyword inside it is not reported separately.
+    """
+
+    def __init__(self, keywords, word_boundary=True, case_sensitive=False, context=40):
+        self.word_boundary = word_boundary
+        self.case_sensitive = case_sensitive
+        self.context = context
+
+        self.keywords = []
+        self._lookup = {}
+        trie = {}
+        for keyword in keywords:
+            key = self._key(keyword)
+            if not key or key in self._lookup:
+                continue
+            self._lookup[key] = len(self.keywords)
+            self.keywords.append(keyword)
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        self.pattern = self._pattern_ic = None
+        if self.keywords:
+            body = _trie_pattern(trie)
+            if word_boundary:
+                # Lookarounds instead of \b so keywords like "$TSLA" or "S&P" still work
+                body = r"(?<!\w)(?:" + body + r")(?!\w)"
+            # The trie holds folded keys, so case-insensitive scans run this
+            # pattern on text.lower(), which is ~2-3x faster than re.IGNORECASE
+            self.pattern = re.compile(body)
+            if not case_sensitive:
+                self._pattern_ic = re.compile(body, re.IGNORECASE)
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _key(self, text):
+        norm = _normalize(text)
+        return norm if self.case_sensitive else norm.lower()
+
+    def _keyword_for(self, matched):
+        # None only for exotic case folds that re accepts but str.lower() does not map
+        index = self._lookup.get(self._key(matched))
+        return None if index is None else self.keywords[index]
+
+    def _matches(self, text):
+        """(span, matched text) pairs from the right pattern for this text"""
+        if self.case_sensitive:
+            return ((m.span(), m.group()) for m in self.pattern.finditer(text))
+        folded = text.lower()
+        # lower() lengthens a few non-ASCII characters, which would shift the
+        # offsets; IGNORECASE keeps them exact for that text
+        if len(folded) != len(text):
+            return ((m.span(), m.group()) for m in self._pattern_ic.finditer(text))
+        return ((m.span(), text[m.start():m.end()]) for m in self.pattern.finditer(folded))
+
+    def finditer(self, text):
+        if self.pattern is None:
+            return
+        for (start, end), matched in self._matches(text):
+            keyword = self._keyword_for(matched)
+            if keyword is None:
+                continue
+            context = text[max(0, start - self.context):end + self.context]
+            yield KeywordHit(keyword, start, end, " ".join(context.split()))
+
+    def scan(self, text):
+        """All hits with offsets and context, plus per-keyword counts in index order"""
+        hits = list(self.finditer(text))
+        found = {}
+        for hit in hits:
+            found[hit.keyword] = found.get(hit.keyword, 0) + 1
+        order = {kw: self._lookup[self._key(kw)] for kw in found}
+        counts = OrderedDict((kw, found[kw]) for kw in sorted(found, key=order.get))
+        return KeywordScan(hits, counts)
+
+    def matched(self, text):
+        """Matched keywords only, in index order"""
+        return self.scan(text).keywords
@@ -0,0 +1,107 @@
+# Offline load test for the stream ear pipeline.
+# Runs the real scheduler, queues, transcription workers and CSV logging, but
+# swaps streamlink/ffmpeg for a fake capture that returns synthetic PCM after
+# a delay, and uses the fake (or faster-whisper) transcriber. Nothing touches
+# the network, so throughput and end-to-end latency can be measured locally.
+#
+# Example:
+#   python load_test.py --streams 24 --interval 2 --record-seconds 0.5 \
+#       --latency 0.4 --workers 4 --batch 4 --duration 30
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+import numpy as np
+
+def build_settings(args, base_dir):
+    return {
+        "BASE_DIR": base_dir,
+        "REPORT_SUBDIR": "reports",
+        "INTERVAL_SECONDS": args.interval,
+        "RECORD_SECONDS": args.record_seconds,
+        "MAX_CAPTURES": args.captures,
+        "MAX_TRANSCRIPTIONS": args.workers,
+        "TRANSCRIBE_BATCH": args.batch,
+        "QUEUE_SIZE": args.queue_size,
+        "CAPTURE_MODE": "pipe",
+        # Synthetic noise would be gated out; keep the gate's cost but transcribe all
+        "AUDIO_GATE": {"enabled": False},
+        "TRANSCRIBER": ({"backend": "fake", "latency": args.latency,
+                         "per_chunk_latency": args.per_chunk_latency}
+                        if args.backend == "fake" else {"backend": args.backend}),
+        "STREAMS": [{"name": f"load{i:03d}", "url": f"fake://load{i:03d}"}
+                    for i in range(args.streams)],
+        "KEYWORDS": ["bullish", "bearish", "calls", "puts", "Google", "Tesla",
+                     "option chain", "strike price", "volume"],
+    }
+
+def make_fake_capture(ear, record_seconds):
+    """Stand-in for record_stream_pcm: low-level noise after a capture-length delay"""
+    rng = np.random.default_rng(0)
+    samples = int(ear.SAMPLE_RATE * record_seconds)
+    pcm = (rng.standard_normal(samples) * 300).astype("<i2").tobytes()
+
+    def fake_capture(stream_url, duration=30, retries=2):
+        time.sleep(record_seconds)
+        return pcm
+    return fake_capture
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream ear load test (no network)")
+    parser.add_argument("--streams", type=int, default=12)
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between captures per stream")
+    parser.add_argument("--record-seconds", type=float, default=0.5, help="simulated capture time")
+    parser.add_argument("--captures", type=int, default=4, help="MAX_CAPTURES")
+    parser.add_argument("--workers", type=int, default=2, help="MAX_TRANSCRIPTIONS")
+    parser.add_argument("--batch", type=int, default=4, help="TRANSCRIBE_BATCH")
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--backend", default="fake", choices=["fake", "faster-whisper"])
+    parser.add_argument("--latency", type=float, default=0.3, help="fake latency per request")
+    parser.add_argument("--per-chunk-latency", type=float, default=0.05)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run")
+    parser.add_argument("--verbose", action="store_true", help="show pipeline output")
+    args = parser.parse_args()
+
+    base_dir = tempfile.mkdtemp(prefix="bowr_load_")
+    settings_path = os.path.join(base_dir, "settings.json")
+    with open(settings_path, "w") as f:
+        json.dump(build_settings(args, base_dir), f)
+    os.environ["BOWR_SETTINGS"] = settings_path
+    import stream_ear_bowrv2 as ear
+
+    ear.record_stream_pcm = make_fake_capture(ear, args.record_seconds)
+    latencies = []
+    log_chunk = ear.log_transcription_with_keywords
+
+    def timed_log(text, captured_at=None, keywords=None, reports_dir=None):
+        log_chunk(text, captured_at, keywords, reports_dir)
+        latencies.append((datetime.now() - captured_at).total_seconds())
+    ear.log_transcription_with_keywords = timed_log
+
+    stop = threading.Event()
+    threading.Timer(args.duration, stop.set).start()
+    start = time.perf_counter()
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        ear.bowr_loop(stop=stop)
+    elapsed = time.perf_counter() - start
+
+    offered = args.streams / args.interval
+    lat = np.array(latencies) if latencies else np.zeros(1)
+    print(f"\n{args.streams} streams every {args.interval}s (offered {offered:.1f} chunks/s), "
+          f"{args.captures} capture slots, {args.workers} workers x batch {args.batch}, "
+          f"backend {args.backend}")
+    print(f"Logged {len(latencies)} chunks in {elapsed:.1f}s -> {len(latencies) / elapsed:.2f} chunks/s")
+    print(f"End-to-end latency (capture start -> logged): "
+          f"p50 {np.percentile(lat, 50):.2f}s  p95 {np.percentile(lat, 95):.2f}s  "
+          f"max {lat.max():.2f}s")
+    print(f"Reports in {os.path.join(base_dir, 'reports')}")
+
+if __name__ == "__main__":
+    main()
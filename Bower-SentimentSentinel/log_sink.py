@@ -0,0 +1,276 @@
+# Buffered transcript/hit log writer for the stream ear.
+# Rows are buffered in memory and written in batches when the buffer is full
+# or every flush_seconds, to long-lived per-day files that rotate when the
+# day changes. Every hit row also gets an entry in hits_index.csv
+# (timestamp, file, byte offset, length), so query_hits can seek straight to
+# the matching rows instead of scanning every daily file. MetricsSink uses the
+# same buffering for plain per-day CSVs with their own columns.
+
+import bisect
+import csv
+import io
+import json
+import os
+import threading
+from datetime import datetime
+
+FIELDS = ["timestamp", "matched_keywords", "snippet"]
+INDEX_FILE = "hits_index.csv"
+FORMATS = ("csv", "jsonl", "parquet")
+
+def _encode_csv(row):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([row[name] for name in FIELDS])
+    return buffer.getvalue().encode("utf-8")
+
+def _encode_jsonl(row):
+    return (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+
+ENCODERS = {"csv": _encode_csv, "jsonl": _encode_jsonl}
+
+class _BufferedDailyWriter:
+    """Row buffer, background flusher and per-day file handles shared by the sinks"""
+
+    def __init__(self, reports_dir, flush_rows, flush_seconds):
+        self.reports_dir = reports_dir
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        os.makedirs(reports_dir, exist_ok=True)
+
+        self._rows = []
+        self._lock = threading.Lock()
+        self._files = {}      # (kind, day, fmt) -> open binary file or ParquetWriter
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="log-flush", daemon=True)
+        self._flusher.start()
+
+    def _append(self, day, row):
+        with self._lock:
+            self._rows.append((day, row))
+            if len(self._rows) >= self.flush_rows:
+                self._flush_locked()
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        raise NotImplementedError
+
+    def _open(self, kind, day, fmt):
+        key = (kind, day, fmt)
+        if key not in self._files:
+            path = os.path.join(self.reports_dir, f"{kind}_{day}.{fmt}")
+            # Binary append, so tell() is an exact byte offset for the index
+            self._files[key] = open(path, "ab")
+        return self._files[key]
+
+    def _rotate(self, current_day):
+        """Close every file belonging to a day before current_day"""
+        for key in [k for k in self._files if k[1] < current_day]:
+            self._files.pop(key).close()
+
+    def close(self):
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+class LogSink(_BufferedDailyWriter):
+    """
+    reports_dir: directory for all_transcripts_<day>.* and master_hits_<day>.*
+    formats: any of "csv", "jsonl", "parquet" (parquet needs pyarrow)
+    flush_rows / flush_seconds: write out when this many rows are buffered,
+    or at least this often
+    """
+
+    def __init__(self, reports_dir, formats=("csv",), flush_rows=50, flush_seconds=5.0):
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown log format(s): {', '.join(sorted(unknown))}")
+        if "parquet" in formats:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise RuntimeError("Parquet logs require pyarrow (pip install pyarrow)") from e
+        self.formats = list(formats)
+        # Offsets are indexed in the first seekable text format
+        self.index_format = next((f for f in self.formats if f in ENCODERS), None)
+        self._parquet_parts = {}
+        self._index = None    # loaded on the first query
+        super().__init__(reports_dir, flush_rows, flush_seconds)
+
+    # ─── WRITING ──────────────────────────────────────────────────────────────
+    def write(self, captured_at, matched_keywords, snippet):
+        row = {
+            "timestamp": captured_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "matched_keywords": ", ".join(matched_keywords),
+            "snippet": snippet,
+        }
+        self._append(captured_at.strftime("%Y_%m_%d"), row)
+
+    def _flush_locked(self):
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+
+        batches = {}
+        for day, row in rows:
+            batches.setdefault(("all_transcripts", day), []).append(row)
+            if row["matched_keywords"]:
+                batches.setdefault(("master_hits", day), []).append(row)
+
+        index_lines = []
+        for (kind, day), batch in batches.items():
+            for fmt in self.formats:
+                if fmt == "parquet":
+                    self._write_parquet(kind, day, batch)
+                    continue
+                f = self._open(kind, day, fmt)
+                if fmt == "csv" and f.tell() == 0:
+                    f.write(_encode_csv(dict(zip(FIELDS, FIELDS))))
+                offset = f.tell()
+                chunks = []
+                for row in batch:
+                    data = ENCODERS[fmt](row)
+                    chunks.append(data)
+                    if kind == "master_hits" and fmt == self.index_format:
+                        index_lines.append([row["timestamp"], os.path.basename(f.name),
+                                            offset, len(data)])
+                    offset += len(data)
+                f.write(b"".join(chunks))
+                f.flush()
+
+        if index_lines:
+            self._append_index(index_lines)
+        self._rotate(max(day for day, _ in rows))
+
+    def _write_parquet(self, kind, day, batch):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        key = (kind, day, "parquet")
+        if key not in self._files:
+            # Parquet cannot be appended to once closed; a late row for a day
+            # that already rotated starts a new part file
+            part = self._parquet_parts.get((kind, day), 0)
+            self._parquet_parts[(kind, day)] = part + 1
+            suffix = f"_part{part}" if part else ""
+            path = os.path.join(self.reports_dir, f"{kind}_{day}{suffix}.parquet")
+            schema = pa.schema([(name, pa.string()) for name in FIELDS])
+            self._files[key] = pq.ParquetWriter(path, schema)
+        writer = self._files[key]
+        writer.write_table(pa.table({name: [row[name] for row in batch] for name in FIELDS},
+                                    schema=writer.schema))
+
+    def _append_index(self, lines):
+        path = os.path.join(self.reports_dir, INDEX_FILE)
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if f.tell() == 0:
+                writer.writerow(["timestamp", "file", "offset", "length"])
+            writer.writerows(lines)
+        if self._index is not None:
+            for timestamp, file_name, offset, length in lines:
+                bisect.insort(self._index, (timestamp, file_name, offset, length))
+
+    # ─── QUERIES ──────────────────────────────────────────────────────────────
+    def _load_index(self):
+        entries = []
+        path = os.path.join(self.reports_dir, INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                for timestamp, file_name, offset, length in reader:
+                    entries.append((timestamp, file_name, int(offset), int(length)))
+        entries.sort()
+        return entries
+
+    def query_hits(self, start=None, end=None, keyword=None):
+        """
+        Hit rows with start <= timestamp <= end (datetimes or "YYYY-MM-DD HH:MM:SS"
+        strings), optionally only those that matched keyword. Rows still
+        buffered are flushed first. An index written under another format
+        setting stays readable; only new hits need a csv or jsonl format.
+        """
+        index_path = os.path.join(self.reports_dir, INDEX_FILE)
+        if self.index_format is None and not os.path.exists(index_path):
+            raise RuntimeError("query_hits needs a csv or jsonl log format")
+        self.flush()
+        with self._lock:
+            if self._index is None:
+                self._index = self._load_index()
+            index = self._index
+            lo = 0 if start is None else bisect.bisect_left(index, (_stamp(start),))
+            hi = len(index) if end is None else bisect.bisect_right(index, (_stamp(end), "\uffff"))
+            entries = index[lo:hi]
+
+        rows = []
+        handles = {}
+        try:
+            for _, file_name, offset, length in entries:
+                if file_name not in handles:
+                    handles[file_name] = open(os.path.join(self.reports_dir, file_name), "rb")
+                f = handles[file_name]
+                f.seek(offset)
+                rows.append(_decode(file_name, f.read(length)))
+        finally:
+            for f in handles.values():
+                f.close()
+
+        if keyword is not None:
+            wanted = keyword.lower()
+            rows = [r for r in rows
+                    if wanted in (k.lower() for k in r["matched_keywords"].split(", "))]
+        return rows
+
+def _decode(file_name, data):
+    """One indexed row, decoded by the format of the file it was written to"""
+    text = data.decode("utf-8")
+    if file_name.endswith(".jsonl"):
+        return json.loads(text)
+    return dict(zip(FIELDS, next(csv.reader(io.StringIO(text)))))
+
+def _stamp(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, datetime) else value
+
+class MetricsSink(_BufferedDailyWriter):
+    """
+    Buffered per-day CSV (<kind>_<day>.csv) for metrics rows with a fixed set
+    of columns, e.g. the audio gate's per-chunk measurements
+    """
+
+    def __init__(self, reports_dir, kind, fields, flush_rows=50, flush_seconds=5.0):
+        self.kind = kind
+        self.fields = list(fields)
+        super().__init__(reports_dir, flush_rows, flush_seconds)
+
+    def write(self, captured_at, row):
+        self._append(captured_at.strftime("%Y_%m_%d"), row)
+
+    def _flush_locked(self):
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+
+        batches = {}
+        for day, row in rows:
+            batches.setdefault(day, []).append(row)
+        for day, batch in batches.items():
+            f = self._open(self.kind, day, "csv")
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=self.fields)
+            if f.tell() == 0:
+                writer.writeheader()
+            writer.writerows(batch)
+            f.write(buffer.getvalue().encode("utf-8"))
+            f.flush()
+        self._rotate(max(batches))
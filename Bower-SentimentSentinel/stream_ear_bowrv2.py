@@ -1,85 +1,271 @@
 #This script will listen to a Youtube stream, transcribe it using OpenAI's Whisper engine, and generate a log report of key words to monitor.
+import io
 import os
-import sys
+import re
 import subprocess
+import tempfile
 import time
-import csv
 import json
+import queue
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
 from datetime import datetime
-from openai import OpenAI
 from dotenv import load_dotenv
-from tqdm import tqdm
+from audio_gate import AudioGate, GateResult
+from keyword_index import KeywordIndex
+from log_sink import LogSink, MetricsSink
+from transcribers import create_transcriber
 
 # ─── LOAD CONFIG ──────────────────────────────────────────────────────────────
 load_dotenv()
-with open("settings.json", "r") as f:
+SETTINGS_PATH = os.environ.get("BOWR_SETTINGS", "settings.json")
+with open(SETTINGS_PATH, "r") as f:
     config = json.load(f)
 
 BASE_DIR = config["BASE_DIR"]
-STREAM_URL = config["STREAM_URL"]
 REPORTS_DIR = os.path.join(BASE_DIR, config["REPORT_SUBDIR"])
 RECORD_SECONDS = config.get("RECORD_SECONDS", 30)
 INTERVAL_MINUTES = config.get("INTERVAL_MINUTES", 15)
+# Seconds between capture starts; 0 records back-to-back. Overrides INTERVAL_MINUTES.
+INTERVAL_SECONDS = config.get("INTERVAL_SECONDS", INTERVAL_MINUTES * 60)
+# Chunks allowed to wait between stages before capture blocks (backpressure)
+QUEUE_SIZE = config.get("QUEUE_SIZE", 4)
 KEYWORDS = config.get("KEYWORDS", [])
+# Whole-word matching ("puts" no longer hits "inputs") and case handling for KEYWORDS
+KEYWORD_WORD_BOUNDARY = config.get("KEYWORD_WORD_BOUNDARY", True)
+KEYWORD_CASE_SENSITIVE = config.get("KEYWORD_CASE_SENSITIVE", False)
+# Concurrent streamlink/ffmpeg captures and concurrent transcription requests
+MAX_CAPTURES = config.get("MAX_CAPTURES", 4)
+MAX_TRANSCRIPTIONS = config.get("MAX_TRANSCRIPTIONS", 2)
+# Extra seconds a capture subprocess may run past its duration before it is killed
+CAPTURE_TIMEOUT_GRACE = config.get("CAPTURE_TIMEOUT_GRACE", 60)
+# Longest wait before retrying a stream whose captures keep failing
+MAX_BACKOFF_SECONDS = config.get("MAX_BACKOFF_SECONDS", 3600)
+# "pipe" streams streamlink -> ffmpeg -> memory; "file" uses temp .ts/.wav files
+CAPTURE_MODE = config.get("CAPTURE_MODE", "pipe")
+# A piped capture shorter than this fraction of record_seconds is treated as an ad/dead air
+MIN_CAPTURE_FRACTION = config.get("MIN_CAPTURE_FRACTION", 0.5)
 
-TMP_TS = os.path.join(BASE_DIR, "temp_stream.ts")
-OUTPUT_WAV = os.path.join(BASE_DIR, "stream_audio.wav")
-os.makedirs(REPORTS_DIR, exist_ok=True)
+# Report formats (csv, jsonl, parquet) and when buffered log rows are written out
+LOG_FORMATS = config.get("LOG_FORMATS", ["csv"])
+LOG_FLUSH_ROWS = config.get("LOG_FLUSH_ROWS", 50)
+LOG_FLUSH_SECONDS = config.get("LOG_FLUSH_SECONDS", 5)
+# Transcription backend (see transcribers.py) and how many queued chunks one worker takes at once
+TRANSCRIBER = create_transcriber(config.get("TRANSCRIBER"))
+TRANSCRIBE_BATCH = config.get("TRANSCRIBE_BATCH", 4)
 
-# ─── VISUALS ───────────────────────────────────────────────────────────────────
-def show_progress_bar(task_name="Processing", duration=3):
-    for _ in tqdm(range(duration), desc=task_name, ncols=75):
-        time.sleep(1)
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # s16le mono
 
-def show_live_timer(seconds):
-    for i in range(seconds):
-        sys.stdout.write(f"\r🔄 Listening: {i+1:02d}s")
-        sys.stdout.flush()
-        time.sleep(1)
-    print()
+# Skip silent, non-speech and repeated chunks before transcription (see audio_gate.py);
+# {"enabled": false} still records the metrics but transcribes everything
+AUDIO_GATE = AudioGate(sample_rate=SAMPLE_RATE, **config.get("AUDIO_GATE", {}))
+
+def build_keyword_index(keywords):
+    return KeywordIndex(keywords, word_boundary=KEYWORD_WORD_BOUNDARY,
+                        case_sensitive=KEYWORD_CASE_SENSITIVE)
+
+KEYWORD_INDEX = build_keyword_index(KEYWORDS)
+
+def load_streams(config):
+    """
+    Normalize the STREAMS list; each entry needs a url and may override
+    name, interval_seconds, record_seconds and keywords (compiled once into a
+    KeywordIndex per stream). A legacy config with
+    a single STREAM_URL becomes one stream reporting straight into REPORTS_DIR.
+    """
+    if not config.get("STREAMS"):
+        return [{
+            "name": "default", "url": config["STREAM_URL"],
+            "interval_seconds": INTERVAL_SECONDS, "record_seconds": RECORD_SECONDS,
+            "keywords": KEYWORD_INDEX, "reports_dir": REPORTS_DIR,
+        }]
+
+    streams, names = [], set()
+    for i, entry in enumerate(config["STREAMS"], 1):
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", entry.get("name") or f"stream{i}")
+        if name in names:
+            raise ValueError(f"Duplicate stream name in settings.json: {name}")
+        names.add(name)
+        streams.append({
+            "name": name,
+            "url": entry["url"],
+            "interval_seconds": entry.get("interval_seconds", INTERVAL_SECONDS),
+            "record_seconds": entry.get("record_seconds", RECORD_SECONDS),
+            "keywords": (build_keyword_index(entry["keywords"]) if "keywords" in entry
+                         else KEYWORD_INDEX),
+            "reports_dir": os.path.join(REPORTS_DIR, name),
+        })
+    return streams
+
+STREAMS = load_streams(config)
+for _stream in STREAMS:
+    os.makedirs(_stream["reports_dir"], exist_ok=True)
+
+@dataclass
+class AudioChunk:
+    """One captured chunk: raw 16 kHz mono s16le PCM in memory, or a WAV file on disk"""
+    stream: dict
+    seq: int
+    captured_at: datetime
+    wav_path: str = None
+    pcm: bytes = None
+
+    @property
+    def audio(self):
+        """What transcribe_audio accepts: WAV bytes for piped chunks, else the file path"""
+        return pcm_to_wav(self.pcm) if self.pcm is not None else self.wav_path
+
+    def read_pcm(self):
+        if self.pcm is not None:
+            return self.pcm
+        with wave.open(self.wav_path, "rb") as wav:
+            return wav.readframes(wav.getnframes())
+
+    def discard(self):
+        if self.wav_path and os.path.exists(self.wav_path):
+            os.remove(self.wav_path)
 
 # ─── AUDIO CAPTURE ─────────────────────────────────────────────────────────────
-def record_stream(stream_url, output_file, duration=30, retries=2):
+def record_stream(stream_url, output_file, duration=30, retries=2, tmp_ts=None):
+    # Every capture gets its own .ts path so parallel captures never collide
+    tmp_ts = tmp_ts or os.path.splitext(output_file)[0] + ".ts"
+    timeout = duration + CAPTURE_TIMEOUT_GRACE
+    try:
+        for attempt in range(1, retries + 1):
+            print(f"[*] Attempt {attempt}: Recording {duration}s of stream...")
+
+            if os.path.exists(tmp_ts):
+                os.remove(tmp_ts)
+
+            cmd = ["streamlink", "--hls-duration", str(duration), "-o", tmp_ts, stream_url, "best"]
+            try:
+                subprocess.run(cmd, check=True, capture_output=True, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                print(f"[!] streamlink did not finish within {timeout}s.")
+                continue
+
+            if not os.path.exists(tmp_ts) or os.path.getsize(tmp_ts) < 200000:
+                print("[!] Stream file missing or too small — likely an ad or dead air.")
+                continue
+
+            ffmpeg_cmd = [
+                "ffmpeg", "-y", "-i", tmp_ts,
+                "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1", output_file
+            ]
+
+            try:
+                result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                print(f"[!] ffmpeg did not finish within {timeout}s.")
+                continue
+            if result.returncode != 0:
+                print("[!] ffmpeg failed:", result.stderr)
+                continue
+
+            if os.path.exists(output_file) and os.path.getsize(output_file) > 50000:
+                print("[*] Recording and conversion complete.")
+                return
+    finally:
+        if os.path.exists(tmp_ts):
+            os.remove(tmp_ts)
+
+    raise RuntimeError("❌ All recording attempts failed.")
+
+def record_stream_pcm(stream_url, duration=30, retries=2):
+    """
+    Pipe streamlink's stdout straight into ffmpeg and collect 16 kHz mono PCM
+    from ffmpeg's stdout. Nothing touches the disk; returns the PCM bytes.
+    """
+    timeout = duration + CAPTURE_TIMEOUT_GRACE
+    min_bytes = int(duration * MIN_CAPTURE_FRACTION * SAMPLE_RATE) * SAMPLE_WIDTH
     for attempt in range(1, retries + 1):
-        print(f"[*] Attempt {attempt}: Recording {duration}s of stream...")
+        print(f"[*] Attempt {attempt}: Recording {duration}s of stream (piped)...")
 
-        if os.path.exists(TMP_TS):
-            os.remove(TMP_TS)
+        # streamlink's messages go to a file, not a pipe nobody reads, so they can
+        # be shown when it fails to resolve or drops the stream
+        with tempfile.TemporaryFile() as streamlink_log:
+            streamlink = subprocess.Popen(
+                ["streamlink", "--hls-duration", str(duration), "-O", stream_url, "best"],
+                stdout=subprocess.PIPE, stderr=streamlink_log)
+            try:
+                ffmpeg = subprocess.Popen(
+                    ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+                     "-vn", "-f", "s16le", "-acodec", "pcm_s16le",
+                     "-ar", str(SAMPLE_RATE), "-ac", "1", "pipe:1"],
+                    stdin=streamlink.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            except Exception:
+                streamlink.terminate()
+                streamlink.wait()
+                raise
+            finally:
+                # Only ffmpeg holds the read end now, so it sees EOF when streamlink exits
+                streamlink.stdout.close()
 
-        cmd = ["streamlink", "--hls-duration", str(duration), "-o", TMP_TS, stream_url, "best"]
-        subprocess.run(cmd, check=True)
+            try:
+                pcm, err = ffmpeg.communicate(timeout=timeout)
+                streamlink.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                print(f"[!] Capture did not finish within {timeout}s.")
+                for proc in (streamlink, ffmpeg):
+                    proc.kill()
+                    proc.wait()
+                continue
 
-        if not os.path.exists(TMP_TS) or os.path.getsize(TMP_TS) < 200000:
-            print("[!] Stream file missing or too small — likely an ad or dead air.")
-            continue
+            if streamlink.returncode != 0:
+                streamlink_log.seek(0)
+                print(f"[!] streamlink exited with code {streamlink.returncode}:",
+                      streamlink_log.read().decode(errors="replace").strip())
 
-        ffmpeg_cmd = [
-            "ffmpeg", "-y", "-i", TMP_TS,
-            "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1", output_file
-        ]
+        if ffmpeg.returncode != 0:
+            print("[!] ffmpeg failed:", err.decode(errors="replace"))
+            continue
 
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print("[!] ffmpeg failed:", result.stderr)
+        seconds = len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+        if len(pcm) < min_bytes:
+            print(f"[!] Only {seconds:.1f}s of audio — likely an ad or dead air.")
             continue
 
-        if os.path.exists(output_file) and os.path.getsize(output_file) > 50000:
-            os.remove(TMP_TS)
-            print("[*] Recording and conversion complete.")
-            return
+        print(f"[*] Captured {seconds:.1f}s of audio ({len(pcm) / 1024:.0f} KB).")
+        return pcm
 
     raise RuntimeError("❌ All recording attempts failed.")
 
+def pcm_to_wav(pcm):
+    """Wrap raw PCM in a WAV header, in memory"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
 # ─── TRANSCRIPTION ─────────────────────────────────────────────────────────────
-def transcribe_audio(file_path):
-    print("[*] Transcribing audio with OpenAI GPT-4o...")
-    client = OpenAI()
-    with open(file_path, "rb") as audio_file:
-        transcript = client.audio.transcriptions.create(
-            model="gpt-4o-transcribe",
-            file=audio_file
-        )
-    return transcript.text
+def transcribe_audio(audio):
+    """audio is a WAV file path or in-memory WAV bytes"""
+    print(f"[*] Transcribing audio with {TRANSCRIBER.name}...")
+    return TRANSCRIBER.transcribe(audio)
+
+def transcribe_chunks(chunks):
+    """Transcribe a batch of chunks; returns (chunk, text or exception) pairs"""
+    print(f"[*] Transcribing {len(chunks)} chunk(s) with {TRANSCRIBER.name}...")
+    try:
+        return list(zip(chunks, TRANSCRIBER.transcribe_batch([c.audio for c in chunks])))
+    except Exception as e:
+        if len(chunks) == 1:
+            return [(chunks[0], e)]
+    # The backend failed the batch as a whole (per-chunk failures come back as
+    # exceptions instead), so nothing was transcribed; send each chunk on its own
+    results = []
+    for chunk in chunks:
+        try:
+            results.append((chunk, TRANSCRIBER.transcribe(chunk.audio)))
+        except Exception as e:
+            results.append((chunk, e))
+    return results
 
 # ─── TOKEN COUNT ───────────────────────────────────────────────────────────────
 def estimate_token_usage(text):
@@ -87,33 +273,63 @@ def estimate_token_usage(text):
     print(f"\n🔢 Estimated token usage: ~{approx_tokens} tokens")
 
 # ─── LOGGING ───────────────────────────────────────────────────────────────────
-def log_transcription_with_keywords(text):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    keywords_hit = [kw for kw in KEYWORDS if kw.lower() in text.lower()]
-    matched_str = ", ".join(keywords_hit) if keywords_hit else ""
-    day_stamp = datetime.now().strftime("%Y_%m_%d")
-    all_path = os.path.join(REPORTS_DIR, f"all_transcripts_{day_stamp}.csv")
-    master_path = os.path.join(REPORTS_DIR, f"master_hits_{day_stamp}.csv")
-
-    with open(all_path, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if f.tell() == 0:
-            writer.writerow(["timestamp", "matched_keywords", "snippet"])
-        writer.writerow([timestamp, matched_str, text.strip()])
+_log_sinks = {}
+_log_sinks_lock = threading.Lock()
 
-    if keywords_hit:
-        with open(master_path, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            if f.tell() == 0:
-                writer.writerow(["timestamp", "matched_keywords", "snippet"])
-            writer.writerow([timestamp, matched_str, text.strip()])
+def get_log_sink(reports_dir):
+    """One long-lived buffered sink per reports directory"""
+    with _log_sinks_lock:
+        if reports_dir not in _log_sinks:
+            _log_sinks[reports_dir] = LogSink(reports_dir, LOG_FORMATS,
+                                              LOG_FLUSH_ROWS, LOG_FLUSH_SECONDS)
+        return _log_sinks[reports_dir]
+
+GATE_FIELDS = ["timestamp", "seq", *(field.name for field in fields(GateResult))]
+_gate_sinks = {}
+
+def get_gate_sink(reports_dir):
+    """One long-lived buffered audio_gate_<day>.csv writer per reports directory"""
+    with _log_sinks_lock:
+        if reports_dir not in _gate_sinks:
+            _gate_sinks[reports_dir] = MetricsSink(reports_dir, "audio_gate", GATE_FIELDS,
+                                                   LOG_FLUSH_ROWS, LOG_FLUSH_SECONDS)
+        return _gate_sinks[reports_dir]
+
+def close_log_sinks():
+    with _log_sinks_lock:
+        for sink in (*_log_sinks.values(), *_gate_sinks.values()):
+            sink.close()
+        _log_sinks.clear()
+        _gate_sinks.clear()
+
+def log_gate_metrics(chunk, gate):
+    """One row per captured chunk in audio_gate_<day>.csv, for tuning AUDIO_GATE"""
+    row = {"timestamp": chunk.captured_at.strftime("%Y-%m-%d %H:%M:%S"), "seq": chunk.seq,
+           **gate.as_dict()}
+    get_gate_sink(chunk.stream["reports_dir"]).write(chunk.captured_at, row)
+
+def log_transcription_with_keywords(text, captured_at=None, keywords=None, reports_dir=None):
+    """keywords: a KeywordIndex or a plain list (default: the KEYWORDS index)"""
+    captured_at = captured_at or datetime.now()
+    if keywords is None:
+        keywords = KEYWORD_INDEX
+    elif not isinstance(keywords, KeywordIndex):
+        keywords = build_keyword_index(keywords)
+    reports_dir = reports_dir or REPORTS_DIR
+    timestamp = captured_at.strftime("%Y-%m-%d %H:%M:%S")
+    scan = keywords.scan(text)
+    keywords_hit = scan.keywords
+    get_log_sink(reports_dir).write(captured_at, keywords_hit, text.strip())
 
+    if keywords_hit:
         print(r"""
         🐦 CHIRP! Keyword Hit Detected!
         ╔═════════════════════════════╗
         ║    📈 SIGNAL ACQUIRED!     ║
         ╚═════════════════════════════╝
         """)
+        for hit in scan.hits:
+            print(f"   🔑 {hit.keyword} @ {hit.start}: …{hit.context}…")
     else:
         print("🟡 No keywords matched. Logged to general transcript.")
 
@@ -121,29 +337,167 @@ def log_transcription_with_keywords(text):
     print("─────────────────────────────")
     print(f"🕒 Timestamp: {timestamp}")
     print(f"📄 Transcript Length: {len(text)} characters")
-    print(f"📁 Reports Saved To: {REPORTS_DIR}")
+    print(f"📁 Reports Saved To: {reports_dir}")
 
-# ─── LOOP ──────────────────────────────────────────────────────────────────────
-def bowr_loop():
-    while True:
-        try:
-            print(f"\n🔄 Listening for {RECORD_SECONDS} seconds...")
-            show_live_timer(RECORD_SECONDS)
+# ─── PIPELINE ──────────────────────────────────────────────────────────────────
+# scheduler -> capture pool -> [audio queue] -> transcribe workers -> [text queue] -> log
+# The scheduler submits a capture for each stream when it is due, at most one
+# in flight per stream, onto MAX_CAPTURES threads that each drive a
+# streamlink/ffmpeg subprocess with a timeout. A dead stream only occupies one
+# slot until its timeout and then backs off; the others keep their cadence.
+# The queues are bounded, so slow transcription blocks capture instead of
+# piling up audio. None is passed downstream as the shutdown signal.
 
-            record_stream(STREAM_URL, OUTPUT_WAV, duration=RECORD_SECONDS)
-            show_progress_bar("Transcribing", duration=3)
+def capture_chunk(stream, seq, audio_q):
+    """Record one chunk of a stream and queue it; returns True on success"""
+    name = stream["name"]
+    chunk = AudioChunk(stream, seq, datetime.now())
+    try:
+        print(f"\n🔄 [{name}] Capturing chunk {seq} ({stream['record_seconds']}s)...")
+        if CAPTURE_MODE == "pipe":
+            chunk.pcm = record_stream_pcm(stream["url"], duration=stream["record_seconds"])
+        else:
+            chunk.wav_path = os.path.join(BASE_DIR, f"stream_audio_{name}_{seq:06d}.wav")
+            record_stream(stream["url"], chunk.wav_path, duration=stream["record_seconds"])
 
-            text = transcribe_audio(OUTPUT_WAV)
-            estimate_token_usage(text)
-            log_transcription_with_keywords(text)
+        gate = AUDIO_GATE.evaluate(chunk.read_pcm(), key=name)
+        log_gate_metrics(chunk, gate)
+        if not gate.transcribe:
+            print(f"🔇 [{name}] Skipping chunk {seq}: {gate.reason} "
+                  f"(rms {gate.rms_dbfs} dBFS, speech {gate.speech_ratio:.0%}, "
+                  f"repeat {gate.duplicate_similarity:.2f})")
+            chunk.discard()
+            return True
+        audio_q.put(chunk)
+        return True
+    except Exception as e:
+        print(f"❌ [{name}] Error during capture:", e)
+        chunk.discard()
+        return False
 
-            print("\n📋 Transcript Snippet:\n", text)
+def schedule_captures(streams, audio_q, stop):
+    """Run captures on a bounded pool until stop is set, then drain the pool"""
+    now = time.monotonic()
+    next_start = {s["name"]: now for s in streams}
+    seqs = {s["name"]: 0 for s in streams}
+    failures = {s["name"]: 0 for s in streams}
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=MAX_CAPTURES, thread_name_prefix="capture") as pool:
+        while not stop.is_set():
+            now = time.monotonic()
+            for stream in streams:
+                name = stream["name"]
+                future = in_flight.get(name)
+                if future is not None:
+                    if not future.done():
+                        continue
+                    del in_flight[name]
+                    if future.result():
+                        failures[name] = 0
+                    else:
+                        # Back off a failing stream so it stops taking capture slots
+                        failures[name] += 1
+                        backoff = min(max(stream["interval_seconds"], 30) * 2 ** (failures[name] - 1),
+                                      MAX_BACKOFF_SECONDS)
+                        next_start[name] = max(next_start[name], now + backoff)
+                        print(f"⏳ [{name}] {failures[name]} failed capture(s), "
+                              f"retrying in {backoff:.0f}s")
+                if now < next_start[name]:
+                    continue
 
+                in_flight[name] = pool.submit(capture_chunk, stream, seqs[name], audio_q)
+                seqs[name] += 1
+                # Fixed cadence measured from capture start; skip ahead if we fell behind
+                next_start[name] += stream["interval_seconds"]
+                if next_start[name] < now:
+                    next_start[name] = now
+
+            delay = min(next_start.values()) - time.monotonic()
+            stop.wait(min(max(delay, 0.05), 0.5))
+
+def transcribe_worker(audio_q, text_q):
+    done = False
+    while not done:
+        chunk = audio_q.get()
+        if chunk is None:
+            break
+        # Take whatever else is already queued, up to TRANSCRIBE_BATCH chunks
+        chunks = [chunk]
+        while len(chunks) < TRANSCRIBE_BATCH:
+            try:
+                chunk = audio_q.get_nowait()
+            except queue.Empty:
+                break
+            if chunk is None:
+                done = True
+                break
+            chunks.append(chunk)
+
+        try:
+            for chunk, text in transcribe_chunks(chunks):
+                if isinstance(text, Exception):
+                    print(f"❌ [{chunk.stream['name']}] Error transcribing chunk {chunk.seq}:", text)
+                else:
+                    text_q.put((chunk, text))
+        finally:
+            for chunk in chunks:
+                chunk.discard()
+                chunk.pcm = None
+
+def log_worker(text_q):
+    # Single writer, so per-stream CSVs never see interleaved rows
+    while True:
+        item = text_q.get()
+        if item is None:
+            break
+        chunk, text = item
+        stream = chunk.stream
+        try:
+            print(f"\n🎙  [{stream['name']}] chunk {chunk.seq}")
+            estimate_token_usage(text)
+            log_transcription_with_keywords(text, chunk.captured_at,
+                                            stream["keywords"], stream["reports_dir"])
+            print("\n📋 Transcript Snippet:\n", text)
         except Exception as e:
-            print("❌ Error during cycle:", e)
+            print(f"❌ [{stream['name']}] Error logging chunk {chunk.seq}:", e)
+
+def bowr_loop(streams=None, stop=None):
+    """Run until Ctrl-C, or until stop (a threading.Event) is set by the caller"""
+    streams = streams or STREAMS
+    stop = stop or threading.Event()
+    audio_q = queue.Queue(maxsize=QUEUE_SIZE)
+    text_q = queue.Queue(maxsize=QUEUE_SIZE)
+    scheduler = threading.Thread(target=schedule_captures, args=(streams, audio_q, stop),
+                                 name="scheduler", daemon=True)
+    transcribers = [threading.Thread(target=transcribe_worker, args=(audio_q, text_q),
+                                     name=f"transcribe-{i}", daemon=True)
+                    for i in range(MAX_TRANSCRIPTIONS)]
+    logger = threading.Thread(target=log_worker, args=(text_q,), name="log", daemon=True)
+
+    print(f"👂 Monitoring {len(streams)} stream(s) with {MAX_CAPTURES} capture slots "
+          f"and {MAX_TRANSCRIPTIONS} transcription workers")
+    for t in [scheduler, *transcribers, logger]:
+        t.start()
+    try:
+        # Sleep rather than join here: a Ctrl-C landing inside join() can make
+        # later joins on the same thread return early
+        while scheduler.is_alive():
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping: finishing in-flight captures and queued chunks...")
+        stop.set()
+    scheduler.join()
 
-        print(f"\n⏳ Waiting {INTERVAL_MINUTES} minutes until next sample...\n")
-        time.sleep(INTERVAL_MINUTES * 60)
+    # Shut the stages down in order once everything upstream has drained
+    for _ in transcribers:
+        audio_q.put(None)
+    for t in transcribers:
+        t.join()
+    text_q.put(None)
+    logger.join()
+    close_log_sinks()
+    TRANSCRIBER.close()
 
 # ─── MAIN ──────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
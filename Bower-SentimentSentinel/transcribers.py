@@ -0,0 +1,190 @@
+# Transcription backends for the stream ear.
+# Every backend takes audio as a WAV file path or in-memory WAV bytes and
+# returns text. One instance is shared by all transcription workers, so
+# clients and models are created once and reused for every chunk.
+#
+# settings.json:
+#   "TRANSCRIBER": {"backend": "openai", "model": "gpt-4o-transcribe"}
+#   "TRANSCRIBER": {"backend": "faster-whisper", "model": "base.en", "compute_type": "int8"}
+#   "TRANSCRIBER": {"backend": "fake", "latency": 0.5}
+
+import io
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class Transcriber:
+    name = "base"
+
+    def transcribe(self, audio):
+        raise NotImplementedError
+
+    def transcribe_batch(self, audios):
+        """
+        Transcribe several chunks; returns one text or exception per chunk, so a
+        failed chunk never costs the others their results. Backends override
+        this when they can do better.
+        """
+        results = []
+        for audio in audios:
+            try:
+                results.append(self.transcribe(audio))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        pass
+
+# ─── OPENAI ───────────────────────────────────────────────────────────────────
+class OpenAITranscriber(Transcriber):
+    """
+    Hosted transcription over one long-lived client (its HTTP connection pool
+    is reused across calls). Transient errors are retried with exponential
+    backoff and jitter; a batch is sent as concurrent requests on that client.
+    """
+    name = "openai"
+
+    def __init__(self, model="gpt-4o-transcribe", max_retries=4, backoff=1.0,
+                 max_backoff=30.0, timeout=120.0, batch_concurrency=4):
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.batch_concurrency = batch_concurrency
+        self._client = None
+        self._lock = threading.Lock()
+        self._pool = None
+
+    @property
+    def client(self):
+        # Created on first use so importing/configuring needs no API key
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI
+                self._client = OpenAI(max_retries=0, timeout=self.timeout)
+            return self._client
+
+    def _is_transient(self, error):
+        import openai
+        if isinstance(error, (openai.APIConnectionError, openai.RateLimitError)):
+            return True  # APITimeoutError is an APIConnectionError
+        return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+    def transcribe(self, audio):
+        for attempt in range(self.max_retries + 1):
+            try:
+                if isinstance(audio, bytes):
+                    return self._request(("stream_audio.wav", audio))
+                with open(audio, "rb") as audio_file:
+                    return self._request(audio_file)
+            except Exception as e:
+                if attempt == self.max_retries or not self._is_transient(e):
+                    raise
+                delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+                delay *= random.uniform(0.5, 1.0)
+                print(f"[!] Transcription failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _request(self, file):
+        transcript = self.client.audio.transcriptions.create(model=self.model, file=file)
+        return transcript.text
+
+    def transcribe_batch(self, audios):
+        if len(audios) <= 1:
+            return super().transcribe_batch(audios)
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.batch_concurrency,
+                                                thread_name_prefix="openai")
+        # One future per chunk: each has already been through its own retries
+        futures = [self._pool.submit(self.transcribe, audio) for audio in audios]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+        if self._client is not None:
+            self._client.close()
+
+# ─── FASTER-WHISPER ───────────────────────────────────────────────────────────
+class FasterWhisperTranscriber(Transcriber):
+    """Local CPU transcription with faster-whisper (pip install faster-whisper)"""
+    name = "faster-whisper"
+
+    def __init__(self, model="base.en", device="cpu", compute_type="int8",
+                 cpu_threads=0, num_workers=1, beam_size=1, language="en"):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError("The faster-whisper backend requires "
+                               "faster-whisper (pip install faster-whisper)") from e
+        # num_workers lets that many transcription workers use the model at once
+        self.model = WhisperModel(model, device=device, compute_type=compute_type,
+                                  cpu_threads=cpu_threads, num_workers=num_workers)
+        self.beam_size = beam_size
+        self.language = language
+
+    def transcribe(self, audio):
+        source = io.BytesIO(audio) if isinstance(audio, bytes) else audio
+        segments, _ = self.model.transcribe(source, beam_size=self.beam_size,
+                                            language=self.language, vad_filter=True)
+        return " ".join(segment.text.strip() for segment in segments)
+
+# ─── FAKE ─────────────────────────────────────────────────────────────────────
+CANNED_TEXTS = [
+    "Markets are opening higher this morning and traders look bullish on Tesla.",
+    "Volume is light and the option chain shows heavy puts at the lower strike price.",
+    "Nothing notable here, just general commentary about the weather and traffic.",
+    "Analysts turned bearish on Google after the call, with calls sold into strength.",
+]
+
+class FakeTranscriber(Transcriber):
+    """
+    Deterministic offline stand-in: cycles through canned texts and sleeps to
+    mimic backend latency. A batch pays the fixed latency once plus
+    per_chunk_latency for each chunk, like a backend with real batching.
+    """
+    name = "fake"
+
+    def __init__(self, texts=None, latency=0.0, per_chunk_latency=0.0):
+        self.texts = texts or CANNED_TEXTS
+        self.latency = latency
+        self.per_chunk_latency = per_chunk_latency
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _next_text(self):
+        with self._lock:
+            return self.texts[next(self._counter) % len(self.texts)]
+
+    def transcribe(self, audio):
+        return self.transcribe_batch([audio])[0]
+
+    def transcribe_batch(self, audios):
+        time.sleep(self.latency + self.per_chunk_latency * len(audios))
+        return [self._next_text() for _ in audios]
+
+BACKENDS = {
+    "openai": OpenAITranscriber,
+    "faster-whisper": FasterWhisperTranscriber,
+    "fake": FakeTranscriber,
+}
+
+def create_transcriber(settings=None):
+    """Build a backend from a TRANSCRIBER settings dict; defaults to OpenAI"""
+    options = dict(settings or {})
+    backend = options.pop("backend", "openai")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown transcriber backend {backend!r}; "
+                         f"choose from {', '.join(BACKENDS)}")
+    return BACKENDS[backend](**options)
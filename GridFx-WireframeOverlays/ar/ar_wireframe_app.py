@@ -1,70 +1,127 @@
 # ar_wireframe_app.py
 # Python-powered AR app with Tron and Escape From NY themes
 
+import time
 import cv2
-import numpy as np
 import matplotlib.pyplot as plt
 import os
 
+from wireframe import THEMES, WireframeRenderer, next_theme
+from overlay_app import (build_parser, check_gui_support, draw_hud, make_overlay,
+                         open_camera, report, roi_from_args)
+from pipeline import StageStats, ThreadedPipeline
+
 # === CONFIG ===
-THEME = "tron"  # Options: "tron", "escape"
-LINE_COLOR = (0, 255, 255) if THEME == "tron" else (0, 255, 0)
+THEME = "tron"  # Options: see wireframe.THEMES
+LINE_COLOR = THEMES[THEME]["line_color"]
 HEADLESS = False
+STATS_INTERVAL = 2.0  # seconds between stats lines
+BUDGET_MS = None  # ms/frame target for the quality governor (None: full quality)
+ROI = None  # (x, y, w, h) to limit edge detection to, None for the whole frame
+
+def save_headless_frame(overlay):
+    save_path = "overlay_frame.jpg"
+    cv2.imwrite(save_path, overlay)
+    print(f"Headless mode: Frame saved to {save_path}")
+    # Optionally show with matplotlib
+    plt.imshow(cv2.cvtColor(overlay, cv2.COLOR_BGR2RGB))
+    plt.title("Wireframe Overlay")
+    plt.axis("off")
+    plt.show()
+
+# === MAIN LOOP ===
+def run_sequential(cap):
+    global THEME, LINE_COLOR
+    renderer = WireframeRenderer(THEME)
+    overlay_fn, governor = make_overlay(renderer, BUDGET_MS, ROI)
+    frame_count = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        overlay = overlay_fn(frame)
+
+        if not HEADLESS:
+            draw_hud(overlay, THEME, LINE_COLOR, governor)
+            cv2.imshow('AR Wireframe Overlay', overlay)
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord('t'):
+                THEME = next_theme(THEME)
+                renderer.theme = THEME
+                LINE_COLOR = renderer.line_color
+        else:
+            # Save the first frame and stop
+            frame_count += 1
+            if frame_count == 1:
+                save_headless_frame(overlay)
+                break
 
-# === FUNCTION TO CHECK GUI SUPPORT ===
-def check_gui_support():
+# === THREADED LOOP ===
+def run_threaded(cap):
+    """Capture and processing on their own threads; this thread only displays"""
+    global THEME, LINE_COLOR
+    renderer = WireframeRenderer(THEME)
+    overlay_fn, governor = make_overlay(renderer, BUDGET_MS, ROI)
+    stats = StageStats()
+    # The renderer's theme is switched from this thread; 't' applies from the next frame
+    pipeline = ThreadedPipeline(cap, overlay_fn, stats=stats)
+    pipeline.start()
+    last_report = time.perf_counter()
     try:
-        cv2.namedWindow("Test")
-        cv2.imshow("Test", np.zeros((10, 10, 3), dtype=np.uint8))
-        cv2.waitKey(1)
-        cv2.destroyAllWindows()
-        return True
-    except cv2.error:
-        return False
+        while pipeline.running:
+            result = pipeline.latest(timeout=0.1)
+            if result is None:
+                continue
+            if HEADLESS:
+                save_headless_frame(result.image)
+                break
 
-HEADLESS = not check_gui_support()
+            overlay = result.image
+            draw_hud(overlay, THEME, LINE_COLOR, governor)
+            cv2.imshow('AR Wireframe Overlay', overlay)
+            stats.record("display", time.perf_counter() - result.captured_at)
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord('t'):
+                THEME = next_theme(THEME)
+                renderer.theme = THEME
+                LINE_COLOR = renderer.line_color
 
-# === INITIALIZE CAMERA ===
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    raise RuntimeError("Could not open camera")
+            if time.perf_counter() - last_report >= STATS_INTERVAL:
+                report(stats, governor)
+                last_report = time.perf_counter()
+    finally:
+        pipeline.stop()
+        report(stats, governor)
 
-# === MAIN LOOP ===
-frame_count = 0
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+def main():
+    global THEME, LINE_COLOR, HEADLESS, BUDGET_MS, ROI
+    parser = build_parser("AR wireframe overlay",
+                          "capture and process on separate threads, dropping stale frames",
+                          default_theme=THEME)
+    args = parser.parse_args()
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, 50, 150)
-    wireframe = np.zeros_like(frame)
-    wireframe[edges != 0] = LINE_COLOR
-    overlay = cv2.addWeighted(frame, 0.5, wireframe, 0.8, 0)
+    THEME = args.theme
+    BUDGET_MS = args.budget_ms
+    ROI = roi_from_args(args)
+    LINE_COLOR = THEMES[THEME]["line_color"]
+    HEADLESS = not check_gui_support()
 
-    if not HEADLESS:
-        cv2.putText(overlay, f"Theme: {THEME.upper()}", (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, LINE_COLOR, 2)
-        cv2.imshow('AR Wireframe Overlay', overlay)
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('t'):
-            THEME = "escape" if THEME == "tron" else "tron"
-            LINE_COLOR = (0, 255, 255) if THEME == "tron" else (0, 255, 0)
-    else:
-        # Save frame every 10 iterations and break after one
-        frame_count += 1
-        if frame_count == 1:
-            save_path = "overlay_frame.jpg"
-            cv2.imwrite(save_path, overlay)
-            print(f"Headless mode: Frame saved to {save_path}")
-            # Optionally show with matplotlib
-            plt.imshow(cv2.cvtColor(overlay, cv2.COLOR_BGR2RGB))
-            plt.title("Wireframe Overlay")
-            plt.axis("off")
-            plt.show()
-            break
+    # === INITIALIZE CAMERA ===
+    cap = open_camera(args.camera)
+
+    try:
+        if args.threaded:
+            run_threaded(cap)
+        else:
+            run_sequential(cap)
+    finally:
+        cap.release()
+        cv2.destroyAllWindows()
 
-cap.release()
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    main()
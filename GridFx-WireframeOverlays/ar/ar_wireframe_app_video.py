@@ -1,71 +1,144 @@
 # ar_wireframe_app.py
 # Python-powered AR app with Tron and Escape From NY themes
 
+import time
 import cv2
-import numpy as np
 import matplotlib.pyplot as plt
 import os
 
+from wireframe import THEMES, WireframeRenderer, next_theme
+from overlay_app import (build_parser, check_gui_support, draw_hud, make_overlay,
+                         open_camera, report, roi_from_args)
+from pipeline import FrameWriter, StageStats, ThreadedPipeline
+
 # === CONFIG ===
-THEME = "tron"  # Options: "tron", "escape"
-LINE_COLOR = (0, 255, 255) if THEME == "tron" else (0, 255, 0)
+THEME = "tron"  # Options: see wireframe.THEMES
+LINE_COLOR = THEMES[THEME]["line_color"]
 HEADLESS = False
-
-# === FUNCTION TO CHECK GUI SUPPORT ===
-def check_gui_support():
-    try:
-        cv2.namedWindow("Test")
-        cv2.imshow("Test", np.zeros((10, 10, 3), dtype=np.uint8))
-        cv2.waitKey(1)
-        cv2.destroyAllWindows()
-        return True
-    except cv2.error:
-        return False
-
-HEADLESS = not check_gui_support()
-
-# === INITIALIZE CAMERA ===
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    raise RuntimeError("Could not open camera")
+OUTPUT_FILE = 'wireframe_output.avi'
+STATS_INTERVAL = 2.0  # seconds between stats lines
+BUDGET_MS = None  # ms/frame target for the quality governor (None: full quality)
+ROI = None  # (x, y, w, h) to limit edge detection to, None for the whole frame
 
 # === VIDEO WRITER SETUP FOR HEADLESS MODE ===
-video_writer = None
-if HEADLESS:
+def open_video_writer(cap, path=OUTPUT_FILE, fps=20.0):
     fourcc = cv2.VideoWriter_fourcc(*'XVID')
-    fps = 20.0
     frame_width = int(cap.get(3))
     frame_height = int(cap.get(4))
-    video_writer = cv2.VideoWriter('wireframe_output.avi', fourcc, fps, (frame_width, frame_height))
+    return cv2.VideoWriter(path, fourcc, fps, (frame_width, frame_height))
 
 # === MAIN LOOP ===
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+def run_sequential(cap):
+    global THEME, LINE_COLOR
+    renderer = WireframeRenderer(THEME)
+    overlay_fn, governor = make_overlay(renderer, BUDGET_MS, ROI)
+    video_writer = open_video_writer(cap) if HEADLESS else None
+    stats = StageStats()
+    last_report = time.perf_counter()
+    if HEADLESS:
+        print("Recording... Press Ctrl+C to stop.")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            start = time.perf_counter()
+            overlay = overlay_fn(frame)
+            stats.record("process", time.perf_counter() - start)
+            stats.count_processed()
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, 50, 150)
-    wireframe = np.zeros_like(frame)
-    wireframe[edges != 0] = LINE_COLOR
-    overlay = cv2.addWeighted(frame, 0.5, wireframe, 0.8, 0)
+            if not HEADLESS:
+                draw_hud(overlay, THEME, LINE_COLOR, governor)
+                cv2.imshow('AR Wireframe Overlay', overlay)
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                elif key == ord('t'):
+                    THEME = next_theme(THEME)
+                    renderer.theme = THEME
+                    LINE_COLOR = renderer.line_color
+            else:
+                # Save each frame to video in headless mode
+                start = time.perf_counter()
+                video_writer.write(overlay)
+                stats.record("write", time.perf_counter() - start)
+                if time.perf_counter() - last_report >= STATS_INTERVAL:
+                    report(stats, governor)
+                    last_report = time.perf_counter()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if video_writer:
+            video_writer.release()
+        report(stats, governor)
 
-    if not HEADLESS:
-        cv2.putText(overlay, f"Theme: {THEME.upper()}", (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, LINE_COLOR, 2)
-        cv2.imshow('AR Wireframe Overlay', overlay)
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('t'):
-            THEME = "escape" if THEME == "tron" else "tron"
-            LINE_COLOR = (0, 255, 255) if THEME == "tron" else (0, 255, 0)
-    else:
-        # Save each frame to video in headless mode
-        video_writer.write(overlay)
+# === THREADED LOOP ===
+def run_threaded(cap):
+    """
+    Capture, processing and (headless) writing each run on their own thread.
+    Stale frames are dropped when processing falls behind the camera; every
+    processed frame is written.
+    """
+    global THEME, LINE_COLOR
+    renderer = WireframeRenderer(THEME)
+    overlay_fn, governor = make_overlay(renderer, BUDGET_MS, ROI)
+    stats = StageStats()
+    writer = FrameWriter(open_video_writer(cap), stats) if HEADLESS else None
+    pipeline = ThreadedPipeline(cap, overlay_fn, writer=writer, stats=stats)
+    pipeline.start()
+    last_report = time.perf_counter()
+    if HEADLESS:
         print("Recording... Press Ctrl+C to stop.")
+    try:
+        while pipeline.running:
+            result = pipeline.latest(timeout=0.1)
+            if result is not None and not HEADLESS:
+                overlay = result.image.copy()  # the writer may still hold the original
+                draw_hud(overlay, THEME, LINE_COLOR, governor)
+                cv2.imshow('AR Wireframe Overlay', overlay)
+                stats.record("display", time.perf_counter() - result.captured_at)
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                elif key == ord('t'):
+                    THEME = next_theme(THEME)
+                    renderer.theme = THEME
+                    LINE_COLOR = renderer.line_color
+
+            if time.perf_counter() - last_report >= STATS_INTERVAL:
+                report(stats, governor)
+                last_report = time.perf_counter()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.stop()
+        report(stats, governor)
+
+def main():
+    global THEME, LINE_COLOR, HEADLESS, BUDGET_MS, ROI
+    parser = build_parser("AR wireframe overlay with recording",
+                          "separate capture, processing and writer threads",
+                          default_theme=THEME)
+    args = parser.parse_args()
+
+    THEME = args.theme
+    BUDGET_MS = args.budget_ms
+    ROI = roi_from_args(args)
+    LINE_COLOR = THEMES[THEME]["line_color"]
+    HEADLESS = not check_gui_support()
+
+    # === INITIALIZE CAMERA ===
+    cap = open_camera(args.camera)
+
+    try:
+        if args.threaded:
+            run_threaded(cap)
+        else:
+            run_sequential(cap)
+    finally:
+        cap.release()
+        cv2.destroyAllWindows()
 
-cap.release()
-if video_writer:
-    video_writer.release()
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+# batch_render.py
+# Offline wireframe overlay for recorded videos, split across a process pool
+#
+# Examples:
+#   python batch_render.py clips/ --output-dir rendered --workers 8
+#   python batch_render.py talk.mp4 --theme escape --segment-seconds 20
+
+import argparse
+import glob
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".m4v", ".webm")
+FOURCC = {".avi": "XVID", ".mp4": "mp4v", ".m4v": "mp4v", ".mov": "mp4v", ".mkv": "XVID"}
+
+# === INPUTS ===
+def find_videos(paths):
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.append(os.path.join(path, name))
+        else:
+            videos.extend(sorted(glob.glob(path)) or [path])
+    return videos
+
+def probe_video(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open {path}")
+    info = {
+        "fps": cap.get(cv2.CAP_PROP_FPS) or 30.0,
+        "frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+    }
+    cap.release()
+    return info
+
+# === SEGMENTS ===
+def _ffprobe(path, entries):
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0",
+           "-show_entries", entries, "-of", "csv=p=0", path]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return result.stdout if result.returncode == 0 else None
+
+def keyframe_times(path):
+    """
+    Keyframe timestamps in seconds from the start of the video stream, read
+    from packet flags (no decoding); None without ffprobe. ffprobe reports
+    absolute pts_time, while OpenCV positions count from the stream's
+    start_time, so that offset is subtracted.
+    """
+    if not shutil.which("ffprobe"):
+        return None
+    packets = _ffprobe(path, "packet=pts_time,flags")
+    if packets is None:
+        return None
+    start = (_ffprobe(path, "stream=start_time") or "").strip()
+    offset = float(start) if start not in ("", "N/A") else 0.0
+    times = []
+    for line in packets.splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" in flags and pts not in ("", "N/A"):
+            times.append(float(pts) - offset)
+    return sorted(times) or None
+
+def plan_segments(info, keyframes, target_frames):
+    """
+    Split the video into (start, end) times in seconds of about target_frames
+    each, cutting only at keyframes when they are known so each worker's seek
+    lands on a keyframe; otherwise cut evenly on frame boundaries (OpenCV then
+    decodes from the prior keyframe to reach the start). Times rather than
+    frame numbers keep the cuts on keyframes for variable frame rate files.
+    """
+    fps = info["fps"]
+    duration = info["frames"] / fps
+    target = target_frames / fps
+    if keyframes:
+        candidates = [t for t in keyframes if t > 0]
+    else:
+        candidates = [n / fps for n in range(target_frames, info["frames"], target_frames)]
+
+    cuts = [0.0]
+    for t in candidates:
+        if t - cuts[-1] >= target and duration - t >= target / 2:
+            cuts.append(t)
+    # The last segment reads to the end, whatever the container's frame count says
+    return [(start, end) for start, end in zip(cuts, cuts[1:] + [None])]
+
+# === WORKER ===
+def init_worker():
+    # The pool provides the parallelism; keep OpenCV to one thread per process
+    cv2.setNumThreads(1)
+
+def render_segment(path, start, end, segment_path, fourcc, theme):
+    """
+    Render the frames with start <= timestamp < end (seconds from the stream
+    start) of path into segment_path; returns (frames, seconds)
+    """
+    from wireframe import WireframeRenderer
+
+    began = time.perf_counter()
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    # Timestamps of frames on a cut match it up to rounding
+    slack_ms = 0.5
+    if start:
+        cap.set(cv2.CAP_PROP_POS_MSEC, start * 1000.0)
+    renderer = WireframeRenderer(theme)
+    writer = None
+    frames = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+        if end is not None and msec >= end * 1000.0 - slack_ms:
+            break
+        if msec < start * 1000.0 - slack_ms:
+            continue  # belongs to the previous segment
+        if writer is None:
+            height, width = frame.shape[:2]
+            writer = cv2.VideoWriter(segment_path, cv2.VideoWriter_fourcc(*fourcc), fps,
+                                     (width, height))
+        writer.write(renderer.render(frame, out=frame))
+        frames += 1
+    cap.release()
+    if writer is not None:
+        writer.release()
+    return frames, time.perf_counter() - began
+
+# === CONCATENATION ===
+def concat_segments(segment_paths, output_path, fourcc, fps, size):
+    """Join segments in order: stream copy with ffmpeg, else re-encode with OpenCV"""
+    segment_paths = [p for p in segment_paths if os.path.exists(p)]
+    if shutil.which("ffmpeg"):
+        list_path = output_path + ".segments.txt"
+        with open(list_path, "w", encoding="utf-8") as f:
+            for p in segment_paths:
+                f.write(f"file '{os.path.abspath(p)}'\n")
+        cmd = ["ffmpeg", "-y", "-v", "error", "-f", "concat", "-safe", "0",
+               "-i", list_path, "-c", "copy", output_path]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        os.remove(list_path)
+        if result.returncode == 0:
+            return
+        print(f"ffmpeg concat failed, re-encoding instead: {result.stderr.strip()}")
+
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+    for p in segment_paths:
+        cap = cv2.VideoCapture(p)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            writer.write(frame)
+        cap.release()
+    writer.release()
+
+# === MAIN ===
+def render_videos(videos, output_dir, theme="tron", workers=None, segment_seconds=None,
+                  suffix="_wireframe"):
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count()
+    jobs = []
+    for path in videos:
+        info = probe_video(path)
+        ext = os.path.splitext(path)[1].lower()
+        ext = ext if ext in FOURCC else ".avi"
+        # Default: enough segments to keep every worker busy, at least 2 s each
+        if segment_seconds:
+            target = max(int(segment_seconds * info["fps"]), 1)
+        else:
+            target = max(info["frames"] // workers, int(2 * info["fps"]), 1)
+        keyframes = keyframe_times(path)
+        segments = plan_segments(info, keyframes, target)
+        base = os.path.splitext(os.path.basename(path))[0]
+        jobs.append({
+            "path": path, "info": info, "ext": ext, "segments": segments,
+            "output": os.path.join(output_dir, f"{base}{suffix}{ext}"),
+            "split": "keyframes" if keyframes else "even",
+        })
+        print(f"{path}: {info['frames']} frames @ {info['fps']:.1f} fps, "
+              f"{len(segments)} segments ({jobs[-1]['split']} split)")
+
+    start = time.perf_counter()
+    total_frames = 0
+    with tempfile.TemporaryDirectory(prefix="wireframe_segments_") as tmp_dir, \
+            ProcessPoolExecutor(max_workers=workers,
+                                mp_context=multiprocessing.get_context("spawn"),
+                                initializer=init_worker) as pool:
+        # Submit every segment of every video up front so the pool stays full
+        for v, job in enumerate(jobs):
+            job["segment_paths"] = []
+            job["futures"] = []
+            for s, (seg_start, seg_end) in enumerate(job["segments"]):
+                seg_path = os.path.join(tmp_dir, f"{v:04d}_{s:05d}{job['ext']}")
+                job["segment_paths"].append(seg_path)
+                job["futures"].append(pool.submit(render_segment, job["path"], seg_start,
+                                                  seg_end, seg_path, FOURCC[job["ext"]], theme))
+
+        for job in jobs:
+            frames = sum(f.result()[0] for f in job["futures"])
+            total_frames += frames
+            info = job["info"]
+            concat_segments(job["segment_paths"], job["output"], FOURCC[job["ext"]],
+                            info["fps"], (info["width"], info["height"]))
+            print(f"✔ {job['output']} ({frames} frames)")
+
+    elapsed = time.perf_counter() - start
+    print(f"\nRendered {total_frames} frames from {len(jobs)} video(s) in {elapsed:.2f}s "
+          f"on {workers} workers: {total_frames / max(elapsed, 1e-9):.1f} frames/s")
+    return total_frames, elapsed
+
+def main():
+    from wireframe import THEMES
+
+    parser = argparse.ArgumentParser(description="Batch wireframe overlay for video files")
+    parser.add_argument("inputs", nargs="+", help="video files, globs or directories")
+    parser.add_argument("--output-dir", default="rendered")
+    parser.add_argument("--theme", choices=list(THEMES), default="tron")
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--segment-seconds", type=float, default=None,
+                        help="target segment length (default: split evenly across workers)")
+    args = parser.parse_args()
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        parser.error("no video files found")
+    render_videos(videos, args.output_dir, args.theme, args.workers, args.segment_seconds)
+
+if __name__ == "__main__":
+    main()
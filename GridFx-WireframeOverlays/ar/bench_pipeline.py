@@ -0,0 +1,174 @@
+# bench_pipeline.py
+# Camera-free per-stage latency benchmark of the overlay pipeline, saved as JSON
+#
+# Examples:
+#   python bench_pipeline.py --output baseline.json
+#   python bench_pipeline.py --video clip.mp4 --compare baseline.json --tolerance 0.15
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from bench_wireframe import RESOLUTIONS, synthetic_frames
+from governor import QualityGovernor
+from wireframe import STAGES, THEMES, WireframeRenderer, process_frame
+
+PERCENTILES = (50, 95, 99)
+
+# === FRAME SOURCES ===
+def video_frames(path, count):
+    """Up to count frames from a video or image file"""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise RuntimeError(f"No frames could be read from {path}")
+    return frames
+
+def frames_at(source, height, width):
+    return [cv2.resize(f, (width, height), interpolation=cv2.INTER_AREA)
+            if f.shape[:2] != (height, width) else f for f in source]
+
+# === MEASUREMENT ===
+def summarize(seconds):
+    ms = np.asarray(seconds) * 1000.0
+    result = {f"p{p}": round(float(np.percentile(ms, p)), 4) for p in PERCENTILES}
+    result["mean"] = round(float(ms.mean()), 4)
+    result["fps"] = round(1000.0 / max(float(ms.mean()), 1e-9), 1)
+    return result
+
+def bench_resolution(frames, iterations, theme, warmup=5, budget_ms=None):
+    """Per-stage timings for one resolution; every stage runs on the same frames"""
+    renderer = WireframeRenderer(theme)
+    line_color = THEMES[theme]["line_color"]
+    timings = {}
+    out = np.empty_like(frames[0])
+    for i in range(warmup + iterations):
+        frame = frames[i % len(frames)]
+        record = timings if i >= warmup else {}
+        start = time.perf_counter()
+        process_frame(frame, renderer, out=out, timings=record)
+        hud_start = time.perf_counter()
+        cv2.putText(out, f"Theme: {theme.upper()}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, line_color, 2)
+        encode_start = time.perf_counter()
+        # Stands in for the write stage without depending on a codec or disk
+        cv2.imencode(".jpg", out)
+        end = time.perf_counter()
+        record.setdefault("hud", []).append(encode_start - hud_start)
+        record.setdefault("encode", []).append(end - encode_start)
+        record.setdefault("total", []).append(end - start)
+
+    if budget_ms is not None:
+        governor = QualityGovernor(WireframeRenderer(theme), budget_ms)
+        for i in range(warmup + iterations):
+            start = time.perf_counter()
+            governor.render(frames[i % len(frames)], out=out)
+            if i >= warmup:
+                timings.setdefault("governed", []).append(time.perf_counter() - start)
+
+    return {stage: summarize(seconds) for stage, seconds in timings.items()}
+
+def environment(args):
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "opencv_threads": cv2.getNumThreads(),
+        "source": args.video or "synthetic",
+        "iterations": args.iterations,
+        "theme": args.theme,
+        "budget_ms": args.budget_ms,
+    }
+
+# === REGRESSION CHECK ===
+def compare(results, baseline, tolerance, metric="p50"):
+    """Print current vs baseline per stage; returns the (resolution, stage) pairs that regressed"""
+    regressions = []
+    print(f"\n{'resolution':<11}{'stage':<11}{'baseline':>10}{'current':>10}{'change':>9}")
+    for name, stages in results.items():
+        for stage, current in stages.items():
+            base = baseline.get(name, {}).get(stage)
+            if base is None:
+                continue
+            change = current[metric] / max(base[metric], 1e-9) - 1
+            flag = ""
+            if change > tolerance:
+                regressions.append((name, stage))
+                flag = "  REGRESSION"
+            print(f"{name:<11}{stage:<11}{base[metric]:>10.2f}{current[metric]:>10.2f}"
+                  f"{change:>+8.0%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage overlay pipeline benchmark")
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS),
+                        choices=list(RESOLUTIONS))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--video", default=None,
+                        help="video or image file to take frames from (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=16, help="distinct frames to cycle through")
+    parser.add_argument("--theme", choices=list(THEMES), default="tron")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="also time QualityGovernor.render at this budget")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="cv2.setNumThreads value (default: OpenCV's choice)")
+    parser.add_argument("--output", default="bench_pipeline.json")
+    parser.add_argument("--compare", default=None, metavar="BASELINE_JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed p50 slowdown before a stage counts as a regression")
+    args = parser.parse_args()
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    source = video_frames(args.video, args.frames) if args.video else None
+    results = {}
+    print(f"{'resolution':<11}{'stage':<11}" + "".join(f"{'p%d ms' % p:>10}" for p in PERCENTILES)
+          + f"{'fps':>9}")
+    for name in args.resolutions:
+        height, width = RESOLUTIONS[name]
+        frames = (frames_at(source, height, width) if source
+                  else synthetic_frames(height, width, count=args.frames))
+        results[name] = bench_resolution(frames, args.iterations, args.theme,
+                                         budget_ms=args.budget_ms)
+        for stage in (*STAGES, "hud", "encode", "total", "governed"):
+            if stage in results[name]:
+                r = results[name][stage]
+                print(f"{name:<11}{stage:<11}" + "".join(f"{r['p%d' % p]:>10.2f}" for p in PERCENTILES)
+                      + f"{r['fps']:>9.1f}")
+
+    report = {"environment": environment(args), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for key in ("opencv", "cpu_count", "platform"):
+            if baseline["environment"].get(key) != report["environment"][key]:
+                print(f"note: baseline {key} differs ({baseline['environment'].get(key)} "
+                      f"vs {report['environment'][key]})")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than the baseline by more than "
+                  f"{args.tolerance:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
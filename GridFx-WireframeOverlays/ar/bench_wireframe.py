@@ -0,0 +1,69 @@
+# bench_wireframe.py
+# ms/frame of the original allocating overlay versus WireframeRenderer
+
+import argparse
+import time
+import cv2
+import numpy as np
+
+from wireframe import THEMES, WireframeRenderer
+
+RESOLUTIONS = {
+    "480p": (480, 640),
+    "720p": (720, 1280),
+    "1080p": (1080, 1920),
+    "4k": (2160, 3840),
+}
+
+def legacy_overlay(frame, line_color):
+    """The per-frame code the AR apps used to run"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(gray, 50, 150)
+    wireframe = np.zeros_like(frame)
+    wireframe[edges != 0] = line_color
+    return cv2.addWeighted(frame, 0.5, wireframe, 0.8, 0)
+
+def synthetic_frames(height, width, count=8, seed=0):
+    """Smoothed noise with some edges, shifted per frame so Canny does real work"""
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    base = cv2.GaussianBlur(base, (7, 7), 0)
+    cv2.rectangle(base, (width // 4, height // 4), (width // 2, height // 2), (255, 255, 255), 3)
+    return [np.roll(base, 7 * i, axis=1) for i in range(count)]
+
+def time_per_frame(fn, frames, iterations):
+    for frame in frames[:2]:
+        fn(frame)  # warm-up (and first-call allocation for the renderer)
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(frames[i % len(frames)])
+    return (time.perf_counter() - start) / iterations * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Wireframe overlay microbenchmark")
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS),
+                        choices=list(RESOLUTIONS))
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--theme", choices=list(THEMES), default="tron")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="cv2.setNumThreads value (default: OpenCV's choice)")
+    args = parser.parse_args()
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    line_color = THEMES[args.theme]["line_color"]
+    print(f"{'resolution':<11}{'legacy ms':>11}{'renderer ms':>13}{'speedup':>9}")
+    for name in args.resolutions:
+        height, width = RESOLUTIONS[name]
+        frames = synthetic_frames(height, width)
+        renderer = WireframeRenderer(args.theme)
+
+        if not np.array_equal(legacy_overlay(frames[0], line_color), renderer.render(frames[0])):
+            print(f"warning: {name} renderer output differs from the legacy overlay")
+
+        legacy = time_per_frame(lambda f: legacy_overlay(f, line_color), frames, args.iterations)
+        reused = time_per_frame(renderer.render, frames, args.iterations)
+        print(f"{name:<11}{legacy:>11.2f}{reused:>13.2f}{legacy / reused:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
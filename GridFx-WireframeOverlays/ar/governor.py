@@ -0,0 +1,180 @@
+# governor.py
+# Frame-time budget for the wireframe overlay: edge scale, ROI, mask reuse, auto thresholds
+
+import time
+
+import cv2
+import numpy as np
+
+# One pyrDown level quarters the pixels Canny sees, so a step finer makes edge
+# detection (not the rest of the frame) about 4x as expensive
+PYRAMID_COST = 4.0
+# Floor for the auto thresholds: a dark frame's median near 0 would give 0/0
+# and turn sensor noise into edges
+MIN_THRESHOLDS = (10, 30)
+
+class QualityGovernor:
+    """
+    Wraps a WireframeRenderer and trades edge detail for speed to stay under
+    budget_ms per frame:
+
+    - scale: Canny runs on a pyrDown level of the gray frame (1, 1/2, 1/4 ...)
+      and the edge mask is scaled back up with nearest-neighbour. The level
+      moves one step at a time from moving averages of frame time and of edge
+      detection time at the current level; a step finer is taken when the
+      frame with PYRAMID_COST times the edge time fits the budget with margin.
+    - roi: (x, y, w, h) in pixels; edges are only detected inside it.
+    - reuse: when a small thumbnail barely changes between frames, the previous
+      edge mask is composited again (at most max_reuse frames in a row).
+    - thresholds: Canny low/high follow 0.66x / 1.33x the median gray level
+      (no lower than MIN_THRESHOLDS) instead of the renderer's fixed 50/150.
+
+    The last decision is kept for summary(), which the apps draw and print.
+    """
+
+    def __init__(self, renderer, budget_ms=None, max_level=2, roi=None, auto_threshold=True,
+                 motion_threshold=1.5, max_reuse=4, settle_frames=10, smoothing=0.2):
+        self.renderer = renderer
+        self.budget_ms = budget_ms
+        self.max_level = max_level
+        self.roi = roi
+        self.auto_threshold = auto_threshold
+        self.motion_threshold = motion_threshold
+        self.max_reuse = max_reuse
+        self.settle_frames = settle_frames
+        self.smoothing = smoothing
+
+        self.level = 0
+        self.frame_ms = None  # moving averages at the current level: full frame time
+        self.edge_ms = None   # and the edge detection part of it
+        self.since_change = 0
+        self.reused_in_row = 0
+        self.reused = 0
+        self.frames = 0
+        self.thresholds = (renderer.low_threshold, renderer.high_threshold)
+        self.motion = 0.0
+        self.last_ms = 0.0
+        self.decision = "full"
+
+        self.shape = None
+        self.gray = None
+        self.edges = None
+        self.thumb = None
+        self.prev_thumb = None
+
+    def _allocate(self, shape):
+        height, width = shape[:2]
+        self.shape = shape
+        self.gray = np.empty((height, width), dtype=np.uint8)
+        # Stays zero outside the ROI; only the ROI window is rewritten per frame
+        self.edges = np.zeros((height, width), dtype=np.uint8)
+        x, y, w, h = self._roi_box(width, height)
+        thumb_w = min(320, w)
+        self.thumb_size = (thumb_w, max(1, round(thumb_w * h / w)))
+        self.thumb = np.empty(self.thumb_size[::-1], dtype=np.uint8)
+        self.prev_thumb = np.empty_like(self.thumb)
+        self.has_prev = False
+
+    def _roi_box(self, width, height):
+        if self.roi is None:
+            return 0, 0, width, height
+        x, y, w, h = self.roi
+        x, y = max(0, min(x, width - 1)), max(0, min(y, height - 1))
+        return x, y, max(1, min(w, width - x)), max(1, min(h, height - y))
+
+    def _low_motion(self):
+        if not self.has_prev:
+            return False
+        self.motion = float(cv2.absdiff(self.thumb, self.prev_thumb).mean())
+        return self.motion < self.motion_threshold and self.reused_in_row < self.max_reuse
+
+    def _detect(self, region, target):
+        small = region
+        for _ in range(self.level):
+            small = cv2.pyrDown(small)
+        if self.auto_threshold:
+            # The thumbnail is a cheap stand-in for the region's median
+            median = float(np.median(self.thumb))
+            low_floor, high_floor = MIN_THRESHOLDS
+            self.thresholds = (int(max(low_floor, 0.66 * median)),
+                               int(min(255, max(high_floor, 1.33 * median))))
+        low, high = self.thresholds
+        if not self.level and target.flags.c_contiguous:
+            cv2.Canny(small, low, high, edges=target)
+            return
+        edges = cv2.Canny(small, low, high)
+        if self.level:
+            cv2.resize(edges, (target.shape[1], target.shape[0]), dst=target,
+                       interpolation=cv2.INTER_NEAREST)
+        else:
+            target[...] = edges
+
+    def _set_level(self, level):
+        self.level = level
+        self.since_change = 0
+        # Timings from another level (or an earlier load) say nothing about this one
+        self.frame_ms = None
+        self.edge_ms = None
+
+    def _average(self, current, sample):
+        return sample if current is None else current + self.smoothing * (sample - current)
+
+    def _adjust(self, elapsed_ms, edge_ms):
+        if self.budget_ms is None:
+            return
+        self.frame_ms = self._average(self.frame_ms, elapsed_ms)
+        self.edge_ms = self._average(self.edge_ms, edge_ms)
+        self.since_change += 1
+        if self.since_change < self.settle_frames:
+            return
+        if self.frame_ms > self.budget_ms and self.level < self.max_level:
+            self._set_level(self.level + 1)
+        elif self.level > 0:
+            # Estimated from the current level rather than a sample taken when the
+            # finer level was left: only edge detection grows with the resolution
+            finer = self.frame_ms + (PYRAMID_COST - 1) * self.edge_ms
+            if finer < 0.85 * self.budget_ms:
+                self._set_level(self.level - 1)
+
+    def render(self, frame, out=None):
+        """Overlay for one BGR frame; same out semantics as WireframeRenderer.render"""
+        start = time.perf_counter()
+        if frame.shape != self.shape:
+            self._allocate(frame.shape)
+        height, width = frame.shape[:2]
+        x, y, w, h = self._roi_box(width, height)
+
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        region = self.gray[y:y + h, x:x + w]
+        cv2.resize(region, self.thumb_size, dst=self.thumb, interpolation=cv2.INTER_AREA)
+
+        if self._low_motion():
+            self.reused_in_row += 1
+            self.reused += 1
+            self.decision = "reuse"
+        else:
+            detect_start = time.perf_counter()
+            self._detect(region, self.edges[y:y + h, x:x + w])
+            edge_ms = (time.perf_counter() - detect_start) * 1000.0
+            self.reused_in_row = 0
+            self.decision = "full" if self.level == 0 else f"1/{2 ** self.level}"
+        self.thumb, self.prev_thumb = self.prev_thumb, self.thumb
+        self.has_prev = True
+
+        result = self.renderer.composite(frame, self.edges, out)
+        self.frames += 1
+        self.last_ms = (time.perf_counter() - start) * 1000.0
+        if self.decision != "reuse":
+            # Reused frames are nearly free and would pull the scale back up
+            self._adjust(self.last_ms, edge_ms)
+        return result
+
+    def summary(self):
+        low, high = self.thresholds
+        roi = "full frame" if self.roi is None else "roi {}x{}+{}+{}".format(
+            self.roi[2], self.roi[3], self.roi[0], self.roi[1])
+        budget = "none" if self.budget_ms is None else f"{self.budget_ms:.0f}ms"
+        return (f"edges {self.decision} | canny {low}/{high}"
+                f"{' auto' if self.auto_threshold else ''} | motion {self.motion:.1f} | "
+                f"reused {self.reused}/{self.frames} | {roi} | "
+                f"{self.last_ms:.1f}ms (budget {budget})")
@@ -0,0 +1,61 @@
+# overlay_app.py
+# Setup shared by the AR wireframe apps: CLI flags, camera, GUI check, overlay and HUD
+
+import argparse
+import cv2
+import numpy as np
+
+from governor import QualityGovernor
+from wireframe import THEMES
+
+# === FUNCTION TO CHECK GUI SUPPORT ===
+def check_gui_support():
+    try:
+        cv2.namedWindow("Test")
+        cv2.imshow("Test", np.zeros((10, 10, 3), dtype=np.uint8))
+        cv2.waitKey(1)
+        cv2.destroyAllWindows()
+        return True
+    except cv2.error:
+        return False
+
+# === COMMAND LINE ===
+def build_parser(description, threaded_help, default_theme="tron"):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--theme", choices=list(THEMES), default=default_theme)
+    parser.add_argument("--camera", type=int, default=0, help="camera index")
+    parser.add_argument("--threaded", action="store_true", help=threaded_help)
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="target ms/frame; lowers edge resolution to stay under it")
+    parser.add_argument("--roi", type=int, nargs=4, metavar=("X", "Y", "W", "H"), default=None,
+                        help="only detect edges inside this region")
+    return parser
+
+def roi_from_args(args):
+    return tuple(args.roi) if args.roi else None
+
+def open_camera(index):
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        raise RuntimeError("Could not open camera")
+    return cap
+
+# === OVERLAY ===
+def make_overlay(renderer, budget_ms=None, roi=None):
+    """In-place overlay function, plus the governor behind it when a budget or ROI is set"""
+    if budget_ms is None and roi is None:
+        return (lambda frame: renderer.render(frame, out=frame)), None
+    governor = QualityGovernor(renderer, budget_ms, roi=roi)
+    return (lambda frame: governor.render(frame, out=frame)), governor
+
+def draw_hud(overlay, theme, line_color, governor=None):
+    cv2.putText(overlay, f"Theme: {theme.upper()}", (10, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, line_color, 2)
+    if governor is not None:
+        cv2.putText(overlay, governor.summary(), (10, 60),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, line_color, 1)
+
+def report(stats, governor=None):
+    print(stats.summary())
+    if governor is not None:
+        print(governor.summary())
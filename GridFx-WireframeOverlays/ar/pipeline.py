@@ -0,0 +1,191 @@
+# pipeline.py
+# Threaded capture -> process -> display/write pipeline for the AR apps
+
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# === STAGE STATS ===
+class StageStats:
+    """Rolling per-stage latencies (ms) plus processed/dropped frame counts"""
+
+    def __init__(self, window=300):
+        self.window = window
+        self.samples = {}
+        self.processed = 0
+        self.dropped = 0
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self.lock:
+            if stage not in self.samples:
+                self.samples[stage] = deque(maxlen=self.window)
+            self.samples[stage].append(seconds * 1000.0)
+
+    def count_processed(self):
+        with self.lock:
+            self.processed += 1
+
+    def count_dropped(self):
+        with self.lock:
+            self.dropped += 1
+
+    def snapshot(self):
+        with self.lock:
+            stages = {name: (float(np.percentile(v, 50)), float(np.percentile(v, 95)))
+                      for name, v in self.samples.items() if v}
+            elapsed = time.perf_counter() - self.started
+            return stages, self.processed / max(elapsed, 1e-9), self.processed, self.dropped
+
+    def summary(self):
+        stages, fps, processed, dropped = self.snapshot()
+        parts = [f"{name} {p50:.1f}/{p95:.1f}ms" for name, (p50, p95) in stages.items()]
+        return (" | ".join(parts) + f" | {fps:.1f} fps, {processed} frames, "
+                f"{dropped} dropped (p50/p95)")
+
+# === LATEST-FRAME QUEUE ===
+class LatestFrameQueue:
+    """
+    Holds only the newest item. put() replaces an item nobody has taken yet,
+    so a slow consumer always gets the freshest frame instead of a backlog.
+    """
+
+    def __init__(self):
+        self.item = None
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def put(self, item):
+        """Returns True if an unconsumed (stale) item was replaced"""
+        with self.cond:
+            replaced = self.item is not None
+            self.item = item
+            self.cond.notify()
+            return replaced
+
+    def get(self, timeout=None):
+        """Newest item, or None on timeout or once closed and empty"""
+        with self.cond:
+            if self.item is None and not self.closed:
+                self.cond.wait(timeout)
+            item, self.item = self.item, None
+            return item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+class Frame:
+    __slots__ = ("seq", "captured_at", "image")
+
+    def __init__(self, seq, captured_at, image):
+        self.seq = seq
+        self.captured_at = captured_at
+        self.image = image
+
+# === WRITER ===
+class FrameWriter:
+    """Drains processed frames to a cv2.VideoWriter on its own thread"""
+
+    def __init__(self, video_writer, stats, max_pending=32):
+        self.video_writer = video_writer
+        self.stats = stats
+        # Bounded: if the disk cannot keep up, processing waits rather than
+        # buffering without limit (recorded frames are never dropped)
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self._run, name="writer", daemon=True)
+        self.thread.start()
+
+    def write(self, image):
+        self.pending.put(image)
+
+    def _run(self):
+        while True:
+            image = self.pending.get()
+            if image is None:
+                break
+            start = time.perf_counter()
+            self.video_writer.write(image)
+            self.stats.record("write", time.perf_counter() - start)
+
+    def close(self):
+        self.pending.put(None)
+        self.thread.join()
+        self.video_writer.release()
+
+# === PIPELINE ===
+class ThreadedPipeline:
+    """
+    capture thread -> [latest frame] -> processing thread -> [latest result] -> caller
+                                                          \\-> FrameWriter (optional)
+    Camera stalls no longer add to processing time, and when processing falls
+    behind the capture thread overwrites the pending frame (counted as dropped).
+    The caller (main thread, which owns the HighGUI window) polls latest().
+    """
+
+    def __init__(self, cap, process, writer=None, stats=None):
+        self.cap = cap
+        self.process = process
+        self.writer = writer
+        self.stats = stats or StageStats()
+        self.frames = LatestFrameQueue()
+        self.results = LatestFrameQueue()
+        self.stop_event = threading.Event()
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._process_loop, name="process", daemon=True),
+        ]
+
+    def start(self):
+        for t in self.threads:
+            t.start()
+        return self
+
+    def _capture_loop(self):
+        seq = 0
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            ret, image = self.cap.read()
+            now = time.perf_counter()
+            if not ret:
+                break
+            self.stats.record("capture", now - start)
+            if self.frames.put(Frame(seq, now, image)):
+                self.stats.count_dropped()
+            seq += 1
+        self.frames.close()
+
+    def _process_loop(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            start = time.perf_counter()
+            self.stats.record("queue", start - frame.captured_at)
+            result = self.process(frame.image)
+            self.stats.record("process", time.perf_counter() - start)
+            self.stats.count_processed()
+            if self.writer is not None:
+                self.writer.write(result)
+            self.results.put(Frame(frame.seq, frame.captured_at, result))
+        self.results.close()
+
+    def latest(self, timeout=0.1):
+        """Newest processed Frame, or None if nothing new arrived in time"""
+        return self.results.get(timeout)
+
+    @property
+    def running(self):
+        return self.threads[1].is_alive()
+
+    def stop(self):
+        self.stop_event.set()
+        for t in self.threads:
+            t.join()
+        if self.writer is not None:
+            self.writer.close()
@@ -0,0 +1,120 @@
+# wireframe.py
+# Allocation-free edge-overlay compositing for the AR apps
+
+import time
+
+import cv2
+import numpy as np
+
+# === THEMES ===
+# line_color is BGR; the overlay is frame * frame_weight + lines * line_weight
+THEMES = {
+    "tron": {"line_color": (0, 255, 255), "frame_weight": 0.5, "line_weight": 0.8},
+    "escape": {"line_color": (0, 255, 0), "frame_weight": 0.5, "line_weight": 0.8},
+}
+
+def next_theme(theme):
+    names = list(THEMES)
+    return names[(names.index(theme) + 1) % len(names)]
+
+class WireframeRenderer:
+    """
+    Same output as the original cvtColor -> Canny -> addWeighted overlay, but
+    every intermediate buffer is allocated once per resolution and reused.
+    Where there is no edge the result is frame * frame_weight; on edges the
+    theme's pre-scaled line color is added under the edge mask, which replaces
+    the zeros_like wireframe and the boolean fancy-index assignment.
+    """
+
+    def __init__(self, theme="tron", low_threshold=50, high_threshold=150):
+        self.low_threshold = low_threshold
+        self.high_threshold = high_threshold
+        self.theme = theme
+        self.shape = None
+        self.gray = None
+        self.edges = None
+        self.output = None
+        self.line_images = {}
+
+    @property
+    def theme(self):
+        return self._theme
+
+    @theme.setter
+    def theme(self, theme):
+        if theme not in THEMES:
+            raise ValueError(f"Unknown theme {theme!r}; choose from {', '.join(THEMES)}")
+        self._theme = theme
+
+    @property
+    def line_color(self):
+        return THEMES[self._theme]["line_color"]
+
+    def _allocate(self, shape):
+        height, width = shape[:2]
+        self.shape = shape
+        self.gray = np.empty((height, width), dtype=np.uint8)
+        self.edges = np.empty((height, width), dtype=np.uint8)
+        self.output = np.empty(shape, dtype=np.uint8)
+        # One solid image of the weighted line color per theme, for the masked add
+        self.line_images = {}
+        for name, theme in THEMES.items():
+            scaled = [min(255, round(c * theme["line_weight"])) for c in theme["line_color"]]
+            self.line_images[name] = np.full(shape, scaled, dtype=np.uint8)
+
+    def to_gray(self, frame):
+        """Grayscale of frame, in the reused gray buffer"""
+        if frame.shape != self.shape:
+            self._allocate(frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        return self.gray
+
+    def canny(self, gray):
+        """Canny edge mask of a gray frame, in the reused edges buffer"""
+        cv2.Canny(gray, self.low_threshold, self.high_threshold, edges=self.edges)
+        return self.edges
+
+    def detect_edges(self, frame):
+        """Canny edge mask of frame, in the reused edges buffer"""
+        return self.canny(self.to_gray(frame))
+
+    def composite(self, frame, edges, out=None):
+        """Blend the theme's lines onto frame under edges (out may be frame itself)"""
+        if frame.shape != self.shape:
+            self._allocate(frame.shape)
+        out = self.output if out is None else out
+        theme = THEMES[self._theme]
+        cv2.convertScaleAbs(frame, dst=out, alpha=theme["frame_weight"])
+        cv2.add(out, self.line_images[self._theme], dst=out, mask=edges)
+        return out
+
+    def render(self, frame, out=None):
+        """
+        Overlay for one BGR frame. The result is written to out, or to an
+        internal buffer that the next call overwrites; pass out=frame to draw
+        in place when the captured frame is not needed afterwards.
+        """
+        edges = self.detect_edges(frame)
+        return self.composite(frame, edges, out)
+
+# === FRAME PIPELINE ===
+STAGES = ("gray", "canny", "composite")
+
+def process_frame(frame, renderer, out=None, timings=None):
+    """
+    One overlay frame as the apps produce it, without any camera or window.
+    With a timings dict, each stage's seconds are appended to timings[stage].
+    """
+    if timings is None:
+        return renderer.render(frame, out)
+    start = time.perf_counter()
+    gray = renderer.to_gray(frame)
+    gray_done = time.perf_counter()
+    edges = renderer.canny(gray)
+    canny_done = time.perf_counter()
+    result = renderer.composite(frame, edges, out)
+    done = time.perf_counter()
+    for stage, seconds in zip(STAGES, (gray_done - start, canny_done - gray_done,
+                                       done - canny_done)):
+        timings.setdefault(stage, []).append(seconds)
+    return result
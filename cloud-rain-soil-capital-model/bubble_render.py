@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# --- Render Settings ---
+COLOR_MAP = {
+    'Solid': 'brown',
+    'Liquid': 'blue',
+    'Gas': 'gray',
+    'Plasma': 'purple'
+}
+TITLE = "Capital State Framework: Liquidity vs Volatility"
+LABELS = {"Liquidity": "Liquidity (0-10)", "Volatility": "Volatility (0-10)"}
+SVG_MAX_POINTS = 1000        # above this, points are drawn with WebGL (Scattergl)
+POINT_MAX_POINTS = 20000     # above this, points are aggregated into a density grid
+GRID_BINS = 50               # grid cells per axis in aggregated mode
+
+# --- Viewport ---
+def parse_relayout(relayout_data):
+    """
+    (x_range, y_range) from a dcc.Graph relayoutData event, None for an axis
+    that is reset to autorange. Returns False for events that don't move the
+    view (drag mode changes, autosize), so callers can skip the update.
+    """
+    if not relayout_data:
+        return None, None
+    view = []
+    changed = False
+    for axis in ("xaxis", "yaxis"):
+        lo, hi = relayout_data.get(f"{axis}.range[0]"), relayout_data.get(f"{axis}.range[1]")
+        if lo is None and f"{axis}.range" in relayout_data:
+            lo, hi = relayout_data[f"{axis}.range"]
+        if lo is not None and hi is not None:
+            view.append((float(min(lo, hi)), float(max(lo, hi))))
+            changed = True
+        else:
+            view.append(None)
+            changed |= bool(relayout_data.get(f"{axis}.autorange"))
+    return tuple(view) if changed else False
+
+def in_view(df, x_range=None, y_range=None):
+    mask = np.ones(len(df), dtype=bool)
+    if x_range is not None:
+        x = df["Liquidity"].to_numpy()
+        mask &= (x >= x_range[0]) & (x <= x_range[1])
+    if y_range is not None:
+        y = df["Volatility"].to_numpy()
+        mask &= (y >= y_range[0]) & (y <= y_range[1])
+    return df if mask.all() else df[mask]
+
+# --- Figure Modes ---
+def svg_figure(df):
+    """Small sets: the original Plotly Express chart, with full hover details."""
+    fig = px.scatter(
+        df,
+        x="Liquidity",
+        y="Volatility",
+        color="State",
+        hover_name="Asset",
+        hover_data=["Category", "Catalyst"],
+        color_discrete_map=COLOR_MAP,
+        title=TITLE,
+        labels=LABELS,
+        render_mode="svg"
+    )
+    fig.update_traces(marker=dict(size=20, opacity=0.8))
+    return fig
+
+def webgl_figure(df):
+    """Large sets: one Scattergl trace per state; hover shows only the asset name."""
+    fig = go.Figure()
+    for state, group in df.groupby("State", sort=False):
+        fig.add_trace(go.Scattergl(
+            x=group["Liquidity"].to_numpy(dtype=np.float32),
+            y=group["Volatility"].to_numpy(dtype=np.float32),
+            mode="markers",
+            name=state,
+            marker=dict(size=5, color=COLOR_MAP.get(state), opacity=0.6),
+            hovertext=group["Asset"].to_numpy(),
+            hovertemplate="%{hovertext}<br>Liquidity %{x}<br>Volatility %{y}<extra>" + state + "</extra>",
+        ))
+    fig.update_layout(title=f"{TITLE} ({len(df):,} assets)")
+    return fig
+
+def density_grid(df, x_range, y_range, bins=GRID_BINS):
+    """Per-state asset counts on a bins x bins Liquidity x Volatility grid."""
+    x = df["Liquidity"].to_numpy(dtype=np.float64)
+    y = df["Volatility"].to_numpy(dtype=np.float64)
+    x_edges = np.linspace(x_range[0], x_range[1], bins + 1)
+    y_edges = np.linspace(y_range[0], y_range[1], bins + 1)
+    xi = np.clip(np.searchsorted(x_edges, x, side="right") - 1, 0, bins - 1)
+    yi = np.clip(np.searchsorted(y_edges, y, side="right") - 1, 0, bins - 1)
+    codes, states = pd.factorize(df["State"])
+    counts = np.bincount((codes * bins + xi) * bins + yi,
+                         minlength=len(states) * bins * bins).reshape(len(states), bins, bins)
+    centers = ((x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2)
+    return states, counts, centers
+
+def aggregated_figure(df, x_range, y_range, bins=GRID_BINS):
+    """Very large sets: bubbles per occupied grid cell, sized by asset count."""
+    states, counts, (x_centers, y_centers) = density_grid(df, x_range, y_range, bins)
+    peak = max(int(counts.max()), 1)
+    fig = go.Figure()
+    for s, state in enumerate(states):
+        xi, yi = np.nonzero(counts[s])
+        cell = counts[s, xi, yi]
+        fig.add_trace(go.Scattergl(
+            x=x_centers[xi].astype(np.float32),
+            y=y_centers[yi].astype(np.float32),
+            mode="markers",
+            name=state,
+            marker=dict(size=(4 + 26 * np.sqrt(cell / peak)).astype(np.float32),
+                        color=COLOR_MAP.get(state), opacity=0.6),
+            customdata=cell,
+            hovertemplate="%{customdata:,} assets<br>Liquidity ~%{x:.2f}<br>"
+                          "Volatility ~%{y:.2f}<extra>" + state + "</extra>",
+        ))
+    fig.update_layout(title=f"{TITLE} ({len(df):,} assets on a {bins}x{bins} grid; zoom in for points)")
+    return fig
+
+# --- Bubble Chart ---
+def bubble_figure(df, x_range=None, y_range=None):
+    """
+    Bubble chart whose payload stays bounded as df grows: SVG with full hover up
+    to SVG_MAX_POINTS, Scattergl up to POINT_MAX_POINTS, a density grid beyond.
+    Passing the zoomed ranges re-renders just that window, so zooming into an
+    aggregated chart drills down to individual assets.
+    """
+    view = in_view(df, x_range, y_range)
+    if len(view) <= SVG_MAX_POINTS:
+        fig = svg_figure(view)
+    elif len(view) <= POINT_MAX_POINTS:
+        fig = webgl_figure(view)
+    else:
+        x_range = x_range or (float(view["Liquidity"].min()), float(view["Liquidity"].max()))
+        y_range = y_range or (float(view["Volatility"].min()), float(view["Volatility"].max()))
+        fig = aggregated_figure(view, x_range, y_range)
+    fig.update_layout(
+        height=600,
+        legend_title_text="State",
+        xaxis_title=LABELS["Liquidity"],
+        yaxis_title=LABELS["Volatility"],
+        # Keeps the user's zoom when the figure is replaced after a drill-down
+        uirevision="bubble",
+    )
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
+    if y_range is not None:
+        fig.update_yaxes(range=list(y_range))
+    return fig
@@ -1,5 +1,6 @@
 import pandas as pd
-import plotly.express as px
+
+from bubble_render import COLOR_MAP, bubble_figure
 
 # --- Load CSV Data ---
 def load_data(filepath):
@@ -9,36 +10,14 @@ def load_data(filepath):
 # --- Map State to Color for Plotly ---
 def assign_colors(df):
     """Map each capital state to a unique color."""
-    color_map = {
-        'Solid': 'brown',
-        'Liquid': 'blue',
-        'Gas': 'gray',
-        'Plasma': 'purple'
-    }
-    df['Color'] = df['State'].map(color_map)
+    df['Color'] = df['State'].map(COLOR_MAP)
     return df
 
 # --- Generate Interactive Bubble Chart ---
 def generate_bubble_chart(df):
     """Create an interactive bubble chart showing Liquidity vs Volatility."""
-    fig = px.scatter(
-        df,
-        x="Liquidity",
-        y="Volatility",
-        size=[10]*len(df),  # Static size for now, or make dynamic later
-        color="State",
-        hover_name="Asset",
-        hover_data=["Category", "Catalyst"],
-        color_discrete_map={
-            'Solid': 'brown',
-            'Liquid': 'blue',
-            'Gas': 'gray',
-            'Plasma': 'purple'
-        },
-        title="Capital State Framework: Liquidity vs Volatility",
-        labels={"Liquidity": "Liquidity (0-10)", "Volatility": "Volatility (0-10)"}
-    )
-    fig.update_layout(height=600)
+    # SVG for small files, WebGL or a density grid for large asset universes
+    fig = bubble_figure(df)
     fig.show()
 
 # --- Main Runner ---
@@ -1,7 +1,16 @@
+import argparse
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, dcc, html, Input, Output, State, ctx, no_update
+
+from bubble_render import bubble_figure, parse_relayout
 
 # --- Load CSV Data ---
 def load_data(filepath):
@@ -9,56 +18,217 @@ def load_data(filepath):
     return pd.read_csv(filepath)
 
 # --- Generate Bubble Chart ---
-def generate_bubble_chart(df):
-    """Create a Plotly Express scatter bubble chart."""
-    fig = px.scatter(
-        df,
-        x="Liquidity",
-        y="Volatility",
-        size=[10]*len(df),
-        color="State",
-        hover_name="Asset",
-        hover_data=["Category", "Catalyst"],
-        color_discrete_map={
-            'Solid': 'brown',
-            'Liquid': 'blue',
-            'Gas': 'gray',
-            'Plasma': 'purple'
-        },
-        title="Capital State Framework: Liquidity vs Volatility",
-        labels={"Liquidity": "Liquidity (0-10)", "Volatility": "Volatility (0-10)"}
-    )
-    fig.update_layout(height=600)
-    return fig
+def generate_bubble_chart(df, x_range=None, y_range=None):
+    """Create the Liquidity vs Volatility bubble chart (SVG, WebGL or density grid by size)."""
+    return bubble_figure(df, x_range, y_range)
+
+# --- Transition History ---
+STATE_ORDER = ['Solid', 'Liquid', 'Gas', 'Plasma']
+SNAPSHOT_DATE = re.compile(r"(\d{4}-?\d{2}-?\d{2})")
+
+class TransitionHistory:
+    """
+    Dated capital_states snapshots and the state->state transition counts between
+    consecutive ones. Each consecutive pair's count matrix is computed once, so
+    adding a newer snapshot only processes the newest pair.
+    """
+
+    def __init__(self):
+        self.labels = list(STATE_ORDER)
+        self.snapshots = {}  # date -> state codes indexed by Asset
+        self.dates = []
+        self.matrices = {}  # (earlier date, later date) -> counts[from, to]
+        # Dash serves callbacks from several threads; the directory refresh adds snapshots
+        self.lock = threading.RLock()
+
+    def code(self, states):
+        for state in pd.unique(states):
+            if state not in self.labels:
+                self.labels.append(state)
+        return pd.Categorical(states, categories=self.labels).codes.astype(np.intp)
+
+    def add_snapshot(self, date, df):
+        date = pd.Timestamp(date)
+        df = df.drop_duplicates("Asset", keep="last")
+        with self.lock:
+            self.snapshots[date] = pd.Series(self.code(df["State"].to_numpy()),
+                                             index=df["Asset"].to_numpy())
+            self.dates = sorted(self.snapshots)
+            # Only the pairs touching the new date are (re)computed
+            i = self.dates.index(date)
+            if 0 < i < len(self.dates) - 1:
+                self.matrices.pop((self.dates[i - 1], self.dates[i + 1]), None)
+            if i > 0:
+                self._count(self.dates[i - 1], date)
+            if i + 1 < len(self.dates):
+                self._count(date, self.dates[i + 1])
+
+    def _count(self, earlier, later):
+        # Inner join on Asset: assets that appear or disappear aren't transitions
+        pairs = pd.concat([self.snapshots[earlier], self.snapshots[later]],
+                          axis=1, join="inner").to_numpy()
+        size = len(self.labels)
+        counts = np.bincount(pairs[:, 0] * size + pairs[:, 1], minlength=size * size)
+        self.matrices[(earlier, later)] = counts.reshape(size, size)
+
+    def matrix(self, start=None, end=None):
+        """Summed transition counts over consecutive snapshots between start and end."""
+        with self.lock:
+            size = len(self.labels)
+            total = np.zeros((size, size), dtype=np.int64)
+            for (earlier, later), counts in self.matrices.items():
+                if (start is None or earlier >= start) and (end is None or later <= end):
+                    # Matrices computed before a new state appeared are smaller
+                    total[:counts.shape[0], :counts.shape[1]] += counts
+            return total
+
+    def load_dir(self, directory):
+        """Add every not-yet-loaded CSV in directory whose name contains a date; returns the count."""
+        added = 0
+        seen = set()
+        for name in sorted(os.listdir(directory)):
+            match = SNAPSHOT_DATE.search(name)
+            if not name.endswith(".csv") or not match:
+                continue
+            date = pd.Timestamp(match.group(1))
+            if date not in self.snapshots and date not in seen:
+                self.add_snapshot(date, pd.read_csv(os.path.join(directory, name),
+                                                    usecols=["Asset", "State"]))
+                seen.add(date)
+                added += 1
+        return added
+
+    def load_long(self, filepath):
+        """Add snapshots from one long-format CSV with Date, Asset and State columns."""
+        history = pd.read_csv(filepath, usecols=["Date", "Asset", "State"], parse_dates=["Date"])
+        for date, df in history.groupby("Date", sort=True):
+            self.add_snapshot(date, df)
+        return history["Date"].nunique()
+
+def load_history(path):
+    history = TransitionHistory()
+    if os.path.isdir(path):
+        history.load_dir(path)
+    else:
+        history.load_long(path)
+    return history
 
 # --- Generate Sankey Diagram ---
-def generate_sankey(df):
-    """Create a Sankey diagram of asset transitions between states."""
-    sources = []
-    targets = []
-    values = []
-
-    # Simulate example transitions (for future: load historical CSVs)
-    state_order = ['Solid', 'Liquid', 'Gas', 'Plasma']
-    state_pairs = [(s1, s2) for s1 in state_order for s2 in state_order if s1 != s2]
-    
-    for s1, s2 in state_pairs:
-        count = df[(df['State'] == s2)].shape[0]  # naive count (replace with real transitions)
-        sources.append(state_order.index(s1))
-        targets.append(state_order.index(s2))
-        values.append(count)
-
-    label_list = state_order
-    link = dict(source=sources, target=targets, value=values)
-    node = dict(label=label_list, pad=20, thickness=20)
+def generate_sankey(counts, labels, title="Transitions Between Capital States", include_stays=False):
+    """Create a Sankey diagram from a from-state x to-state count matrix."""
+    if not include_stays:
+        counts = counts.copy()
+        np.fill_diagonal(counts, 0)
+    sources, targets = np.nonzero(counts)
+    # Left column is the earlier state, right column the later one (no cycles)
+    node = dict(label=list(labels) * 2, pad=20, thickness=20)
+    link = dict(source=sources.tolist(), target=(targets + len(labels)).tolist(),
+                value=counts[sources, targets].tolist())
 
     sankey = go.Figure(data=[go.Sankey(node=node, link=link)])
-    sankey.update_layout(title_text="Hypothetical Transitions Between Capital States", font_size=12)
+    if not len(sources):
+        title += " (no transitions in range)"
+    sankey.update_layout(title_text=title, font_size=12)
     return sankey
 
+# --- Filter Bitmaps ---
+class FilterIndex:
+    """Per-value row bitmaps for State and Category, so a filter is an OR/AND of bool arrays."""
+
+    def __init__(self, df, columns=("State", "Category")):
+        self.df = df
+        self.bitmaps = {
+            col: {value: (df[col] == value).to_numpy() for value in df[col].unique()}
+            for col in columns
+        }
+
+    def select(self, column, values):
+        """Rows whose column is any of values."""
+        mask = np.zeros(len(self.df), dtype=bool)
+        for value in values:
+            bitmap = self.bitmaps[column].get(value)
+            if bitmap is not None:
+                mask |= bitmap
+        return mask
+
+    def filter(self, states, categories):
+        return self.df[self.select("State", states) & self.select("Category", categories)]
+
+# --- Figure Cache ---
+class FigureCache:
+    """LRU cache of serialized bubble figures keyed on the normalized filter selection."""
+
+    def __init__(self, index, max_size=128):
+        self.index = index
+        self.max_size = max_size
+        self.figures = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Dash serves callbacks from several threads; figures are built outside the lock
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(states, categories, view=(None, None)):
+        # Order and duplicates in the dropdown values don't change the figure;
+        # zoom ranges are rounded so near-identical viewports share an entry
+        view = tuple(None if r is None else (round(r[0], 3), round(r[1], 3)) for r in view)
+        return tuple(sorted(set(states or []))), tuple(sorted(set(categories or []))), view
+
+    def get(self, states, categories, view=(None, None)):
+        key = self.key(states, categories, view)
+        with self.lock:
+            figure = self.figures.get(key)
+            if figure is not None:
+                self.hits += 1
+                self.figures.move_to_end(key)
+                return figure
+            self.misses += 1
+        fig = generate_bubble_chart(self.index.filter(key[0], key[1]), *key[2])
+        # Stored as plain JSON data: built and serialized once, cheap for Dash to send again
+        figure = json.loads(fig.to_json())
+        with self.lock:
+            # Another thread may have built the same selection meanwhile; either copy is fine
+            self.figures[key] = figure
+            self.figures.move_to_end(key)
+            if len(self.figures) > self.max_size:
+                self.figures.popitem(last=False)
+        return figure
+
 # --- Create Dash App ---
-def run_dash_app(filepath):
+def date_marks(dates, max_marks=10):
+    step = max(1, -(-len(dates) // max_marks))
+    return {i: dates[i].strftime("%Y-%m-%d") for i in range(0, len(dates), step)}
+
+def placeholder_sankey():
+    return generate_sankey(
+        np.zeros((len(STATE_ORDER), len(STATE_ORDER)), dtype=np.int64), STATE_ORDER,
+        title="Transitions Between Capital States (needs two or more snapshots: --history)")
+
+def history_style(history):
+    # The slider stays in the layout (hidden) until there are two snapshots to span
+    return {} if len(history.dates) > 1 else {"display": "none"}
+
+def history_controls(history):
+    """Date-range slider over the snapshots plus the transition Sankey."""
+    if history is None:
+        return [dcc.Graph(id='sankey', figure=placeholder_sankey())]
+    last = max(len(history.dates) - 1, 0)
+    return [
+        html.Div([
+            html.Label("Snapshot range:"),
+            dcc.RangeSlider(id='history-range', min=0, max=last, step=1, value=[0, last],
+                            marks=date_marks(history.dates), allowCross=False),
+        ], id='history-panel', style=history_style(history)),
+        dcc.Graph(id='sankey'),
+    ]
+
+def create_app(filepath, cache_size=128, history_path=None, refresh_seconds=60):
+    """Build the Dash app; the Flask server is app.server (for gunicorn and similar)."""
     df = load_data(filepath)
+    history = load_history(history_path) if history_path else None
+    cache = FigureCache(FilterIndex(df), max_size=cache_size)
+    all_states = df['State'].unique().tolist()
+    all_categories = df['Category'].unique().tolist()
 
     app = Dash(__name__)
 
@@ -67,35 +237,106 @@ def run_dash_app(filepath):
 
         html.Label("Filter by State:"),
         dcc.Dropdown(
-            options=[{"label": s, "value": s} for s in df['State'].unique()],
-            value=df['State'].unique().tolist(),
+            options=[{"label": s, "value": s} for s in all_states],
+            value=all_states,
             multi=True,
             id='state-filter'
         ),
 
         html.Label("Filter by Category:"),
         dcc.Dropdown(
-            options=[{"label": c, "value": c} for c in df['Category'].unique()],
-            value=df['Category'].unique().tolist(),
+            options=[{"label": c, "value": c} for c in all_categories],
+            value=all_categories,
             multi=True,
             id='category-filter'
         ),
 
         dcc.Graph(id='bubble-chart'),
-        dcc.Graph(figure=generate_sankey(df))
+        *history_controls(history),
+        # New snapshot files dropped into the history directory are picked up here
+        *([dcc.Interval(id='history-refresh', interval=refresh_seconds * 1000)]
+          if history_path and os.path.isdir(history_path) else []),
     ])
 
     @app.callback(
         Output('bubble-chart', 'figure'),
         Input('state-filter', 'value'),
-        Input('category-filter', 'value')
+        Input('category-filter', 'value'),
+        Input('bubble-chart', 'relayoutData')
     )
-    def update_bubble(selected_states, selected_categories):
-        filtered_df = df[df['State'].isin(selected_states) & df['Category'].isin(selected_categories)]
-        return generate_bubble_chart(filtered_df)
+    def update_bubble(selected_states, selected_categories, relayout_data):
+        # Zooming re-renders the visible window (drill-down from the density grid)
+        view = parse_relayout(relayout_data)
+        if view is False:
+            if ctx.triggered_id == 'bubble-chart':
+                return no_update
+            view = (None, None)
+        return cache.get(selected_states, selected_categories, view)
+
+    if history is not None:
+        @app.callback(
+            Output('sankey', 'figure'),
+            Input('history-range', 'value')
+        )
+        def update_sankey(date_range):
+            if len(history.dates) < 2:
+                return placeholder_sankey()
+            start, end = history.dates[date_range[0]], history.dates[date_range[1]]
+            title = f"Transitions Between Capital States, {start:%Y-%m-%d} to {end:%Y-%m-%d}"
+            return generate_sankey(history.matrix(start, end), history.labels, title=title)
 
-    app.run(debug=True)
+        if os.path.isdir(history_path):
+            @app.callback(
+                Output('history-range', 'max'),
+                Output('history-range', 'marks'),
+                Output('history-range', 'value'),
+                Output('history-panel', 'style'),
+                Input('history-refresh', 'n_intervals'),
+                State('history-range', 'value'),
+                State('history-range', 'max'),
+                prevent_initial_call=True
+            )
+            def refresh_history(_, date_range, old_last):
+                before = list(history.dates)
+                if not history.load_dir(history_path):
+                    return no_update, no_update, no_update, no_update
+                last = len(history.dates) - 1
+                if len(before) < 2:
+                    # The slider was hidden until now: start from the full range
+                    return last, date_marks(history.dates), [0, last], history_style(history)
+                # Keep the selected dates (a backfilled snapshot shifts the indices);
+                # a range that ended at the newest snapshot follows the new one
+                start = history.dates.index(before[date_range[0]])
+                end = last if date_range[1] == old_last else history.dates.index(before[date_range[1]])
+                return last, date_marks(history.dates), [start, end], no_update
+
+    # Every session starts from the full selection
+    cache.get(all_states, all_categories)
+    app.figure_cache = cache
+    app.transition_history = history
+    return app
+
+def run_dash_app(filepath, debug=False, host="127.0.0.1", port=8050, cache_size=128,
+                 history_path=None):
+    app = create_app(filepath, cache_size=cache_size, history_path=history_path)
+    # Production mode: no debugger or reloader (the reloader runs a second copy of the app)
+    app.run(debug=debug, use_reloader=debug, host=host, port=port)
 
 # --- Main Entry Point ---
+def main():
+    parser = argparse.ArgumentParser(description="Capital State Framework dashboard")
+    parser.add_argument("filepath", nargs="?", default="capital_states.csv")
+    parser.add_argument("--debug", action="store_true", help="Dash debugger and hot reload")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--cache-size", type=int, default=128,
+                        help="bubble figures kept for recent filter selections")
+    parser.add_argument("--history", default=None,
+                        help="directory of dated capital_states CSVs (e.g. capital_states_2025-04-16.csv) "
+                             "or one CSV with Date, Asset and State columns")
+    args = parser.parse_args()
+    run_dash_app(args.filepath, debug=args.debug, host=args.host, port=args.port,
+                 cache_size=args.cache_size, history_path=args.history)
+
 if __name__ == "__main__":
-    run_dash_app("capital_states.csv")
+    main()
@@ -0,0 +1,61 @@
+# Frames/sec of the legacy FuncAnimation + pillow writer save versus the
+# incremental render_simulation encoder path.
+#
+# Example:
+#   python benchmark_render.py --days 14 --target-frames 120
+
+import argparse
+import os
+import tempfile
+import time
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import fractal_stock_simulator as fss
+
+def bench_legacy(dates, prices, path):
+    fig, anim = fss.build_animation(dates, prices)
+    start = time.perf_counter()
+    anim.save(path, writer='pillow')
+    elapsed = time.perf_counter() - start
+    plt.close(fig)
+    return len(dates), elapsed
+
+def bench_fast(dates, prices, path, stride, target_frames, writer):
+    start = time.perf_counter()
+    frames = fss.render_simulation(dates, prices, path, stride, target_frames, writer=writer)
+    return frames, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Animation rendering benchmark")
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--stride", type=int, default=1)
+    parser.add_argument("--target-frames", type=int, default=None)
+    parser.add_argument("--writer", default="auto", help="auto, ffmpeg or pillow")
+    parser.add_argument("--skip-legacy", action="store_true")
+    parser.add_argument("--output-dir", default=None, help="default: a temp directory")
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or tempfile.mkdtemp(prefix="fbm_render_")
+    os.makedirs(output_dir, exist_ok=True)
+    dates, prices = fss.simulate_stock_price(100.0, days=args.days)
+
+    results = []
+    if not args.skip_legacy:
+        results.append(("legacy FuncAnimation/pillow",
+                        *bench_legacy(dates, prices, os.path.join(output_dir, "legacy.gif"))))
+    results.append((f"render_simulation gif ({args.writer})",
+                    *bench_fast(dates, prices, os.path.join(output_dir, "fast.gif"),
+                                args.stride, args.target_frames, args.writer)))
+    if args.writer != "pillow" and fss.shutil.which('ffmpeg'):
+        results.append(("render_simulation mp4 (ffmpeg)",
+                        *bench_fast(dates, prices, os.path.join(output_dir, "fast.mp4"),
+                                    args.stride, args.target_frames, "ffmpeg")))
+
+    print(f"\n{len(dates)} points, output in {output_dir}")
+    print(f"{'renderer':<34}{'frames':>8}{'seconds':>10}{'frames/s':>10}")
+    for name, frames, elapsed in results:
+        print(f"{name:<34}{frames:>8}{elapsed:>10.2f}{frames / elapsed:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+class FactorCache:
+    """
+    LRU store for covariance factors keyed by tuples such as
+    ("cholesky", n, H, dt).
+
+    max_bytes: in-memory budget; least recently used factors are evicted first
+    cache_dir: optional directory of .npy files. Factors found there are
+        opened with mmap_mode='r', so a new process reuses them without
+        recomputing and pages in only what it touches.
+    """
+
+    def __init__(self, max_bytes=256 * 2**20, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, compute):
+        """Return the factor for key, calling compute() only on a full miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = self._load(key)
+        if value is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            value = compute()
+            self._save(key, value)
+
+        with self._lock:
+            self._insert(key, value)
+        return value
+
+    def clear(self):
+        """Drop in-memory entries; files in cache_dir are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def _insert(self, key, value):
+        if key in self._entries:
+            self._nbytes -= self._entries.pop(key).nbytes
+        if value.nbytes > self.max_bytes:
+            return
+        self._entries[key] = value
+        self._nbytes += value.nbytes
+        while self._nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key[0]}_{key[1]}_{digest}.npy")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            # Truncated or foreign file: recompute and overwrite it
+            return None
+
+    def _save(self, key, value):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        # Write under a unique name and rename so concurrent processes never
+        # map a partially written file.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, value)
+        os.replace(tmp_path, path)
@@ -1,86 +1,252 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from datetime import datetime, timedelta
-import matplotlib.dates as mdates
+from datetime import datetime
 import os
+import shutil
+import subprocess
+from factor_cache import FactorCache
 
-def generate_fbm(n, H, dt=1):
+# Above this many points the dense Cholesky path (O(n^3) time, O(n^2) memory)
+# is replaced by circulant embedding in simulate_stock_price.
+FFT_THRESHOLD = 1024
+
+# Shared store for covariance factors keyed by (method, n, H, dt). Replace it
+# with FactorCache(cache_dir=...) to persist factors across processes.
+FACTOR_CACHE = FactorCache()
+
+def fgn_autocovariance(n, H):
+    """
+    Autocovariance of unit-step fractional Gaussian noise at lags 0..n-1
+    n: number of lags
+    H: Hurst exponent (0 < H < 1)
+    """
+    k = np.arange(n, dtype=float)
+    return 0.5 * (np.abs(k + 1)**(2*H) + np.abs(k - 1)**(2*H) - 2*k**(2*H))
+
+def cholesky_factor(n, H, dt=1):
+    """
+    Lower Cholesky factor of the fGn covariance matrix for time step dt
+    n: number of points
+    H: Hurst exponent (0 < H < 1)
+    dt: time step
+    """
+    # Generate covariance matrix (Toeplitz in the lag |i - j|)
+    gamma = fgn_autocovariance(n, H)
+    idx = np.arange(n)
+    cov = gamma[np.abs(idx[:, None] - idx[None, :])]
+    
+    # Cholesky decomposition
+    return np.sqrt(dt) * np.linalg.cholesky(cov)
+
+def generate_fbm(n, H, dt=1, rng=None):
     """
     Generate Fractional Brownian Motion
     n: number of points
     H: Hurst exponent (0 < H < 1)
     dt: time step
+    rng: optional numpy Generator (defaults to the global numpy random state)
     """
+    rng = np.random if rng is None else rng
+
     # Initialize arrays
     t = np.arange(n) * dt
-    dB = np.random.normal(0, np.sqrt(dt), n)
+    z = rng.standard_normal(n)
     
-    # Generate covariance matrix
-    cov = np.zeros((n, n))
-    for i in range(n):
-        for j in range(n):
-            cov[i,j] = 0.5 * (abs(i-j+1)**(2*H) + abs(i-j-1)**(2*H) - 2*abs(i-j)**(2*H))
-    
-    # Cholesky decomposition
-    L = np.linalg.cholesky(cov)
+    # Cholesky factor of the covariance (scaled by sqrt(dt)), cached
+    L = get_factor(n, H, dt, "cholesky")
     
     # Generate fBm
-    fBm = L @ dB
+    fBm = L @ z
     return t, fBm
 
-def simulate_stock_price(initial_price, days=14, H=0.6, volatility=0.02):
+def circulant_eigenvalues(n, H):
+    """
+    Eigenvalues of the 2n circulant embedding of the fGn covariance.
+    Raises ValueError if the embedding is not positive semi-definite.
+    """
+    gamma = fgn_autocovariance(n + 1, H)
+    row = np.concatenate([gamma, gamma[-2:0:-1]])
+    eigenvalues = np.fft.rfft(row).real
+
+    # Clip rounding noise; a genuinely negative eigenvalue means the
+    # embedding is invalid and the samples would have the wrong covariance.
+    tol = 1e-10 * eigenvalues.max()
+    if eigenvalues.min() < -tol:
+        raise ValueError(f"Circulant embedding is not valid for H={H}, n={n}")
+    return np.maximum(eigenvalues, 0)
+
+def circulant_spectrum(n, H, dt=1):
+    """
+    Square-root spectrum used by circulant_fgn: sqrt(2n * dt * eigenvalues)
+    n: number of points
+    H: Hurst exponent (0 < H < 1)
+    dt: time step
+    """
+    return np.sqrt(circulant_eigenvalues(n, H) * 2 * n * dt)
+
+def circulant_fgn(spectrum, n, rng, size=1):
+    """
+    Draw `size` fGn samples of length n from a precomputed circulant spectrum.
+    Returns an array of shape (size, n).
+    """
+    # Hermitian-symmetric complex Gaussian weights so the inverse FFT is real:
+    # bins 0 and n are real with variance 1, the rest complex with variance 1/2
+    # per component.
+    Z = rng.standard_normal((size, n + 1)) + 0j
+    Z[:, 1:n] = (Z[:, 1:n] + 1j * rng.standard_normal((size, n - 1))) / np.sqrt(2)
+    Z *= spectrum
+    W = np.fft.irfft(Z, 2 * n, axis=1)
+
+    return W[:, :n]
+
+def get_factor(n, H, dt=1, method="cholesky", cache=None):
+    """
+    Return the cached Cholesky factor or circulant spectrum for (n, H, dt)
+    method: "cholesky" or "fft"
+    cache: FactorCache to use (defaults to FACTOR_CACHE)
+    """
+    cache = FACTOR_CACHE if cache is None else cache
+    key = (method, int(n), float(H), float(dt))
+    if method == "cholesky":
+        return cache.get(key, lambda: cholesky_factor(n, H, dt))
+    if method == "fft":
+        return cache.get(key, lambda: circulant_spectrum(n, H, dt))
+    raise ValueError(f"Unknown fBm method: {method}")
+
+def generate_fbm_fft(n, H, dt=1, rng=None):
+    """
+    Generate Fractional Brownian Motion by circulant embedding (Davies-Harte).
+    Exact in distribution, same output as generate_fbm in O(n log n) time
+    and O(n) memory.
+    n: number of points
+    H: Hurst exponent (0 < H < 1)
+    dt: time step
+    rng: optional numpy Generator (defaults to the global numpy random state)
+    """
+    rng = np.random if rng is None else rng
+
+    t = np.arange(n) * dt
+    spectrum = get_factor(n, H, dt, "fft")
+    fBm = circulant_fgn(spectrum, n, rng)[0]
+    return t, fBm
+
+def _resolve_method(method, n_points):
+    if method == "auto":
+        return "fft" if n_points > FFT_THRESHOLD else "cholesky"
+    if method not in ("fft", "cholesky"):
+        raise ValueError(f"Unknown fBm method: {method}")
+    return method
+
+def simulate_stock_price(initial_price, days=14, H=0.6, volatility=0.02, method="auto"):
     """
     Simulate stock price using fBm
     initial_price: starting price
     days: number of days to simulate
     H: Hurst exponent (0 < H < 1)
     volatility: price volatility
+    method: "cholesky", "fft", or "auto" (fft above FFT_THRESHOLD points)
     """
     # Generate time points (daily)
     n_points = days * 24  # hourly points
-    t, fBm = generate_fbm(n_points, H, dt=1/24)
+    if _resolve_method(method, n_points) == "fft":
+        t, fBm = generate_fbm_fft(n_points, H, dt=1/24)
+    else:
+        t, fBm = generate_fbm(n_points, H, dt=1/24)
     
     # Convert to price series
     price = initial_price * np.exp(volatility * fBm)
     
-    # Generate dates
-    dates = [datetime.now() + timedelta(hours=i) for i in range(n_points)]
+    # Generate dates (hourly np.datetime64 array)
+    dates = np.datetime64(datetime.now(), 's') + np.arange(n_points) * np.timedelta64(1, 'h')
     
     return dates, price
 
-def animate_simulation(initial_price):
-    # Create output directory if it doesn't exist
-    output_dir = 'output'
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    # Generate timestamp for filename
-    timestamp = datetime.now().strftime('%m_%d_%Y')
-    output_file = os.path.join(output_dir, f'stock_simulation_{timestamp}.gif')
-    
-    # Create figure and axis
-    fig, ax = plt.subplots(figsize=(12, 6))
+def iter_path_chunks(initial_price, n_paths, days=14, H=0.6, volatility=0.02,
+                     seed=None, chunk_size=10000, method="auto"):
+    """
+    Yield simulated price paths in blocks of at most chunk_size rows.
+    The covariance factor (or circulant spectrum) comes from FACTOR_CACHE and each
+    block is produced by a single batched matrix multiply or FFT, so working
+    memory is bounded by chunk_size * n_points regardless of n_paths.
+    """
+    if n_paths < 0 or chunk_size < 1:
+        raise ValueError("n_paths must be >= 0 and chunk_size >= 1")
+    rng = np.random.default_rng(seed)
+    n_points = days * 24  # hourly points
+    dt = 1/24
+    method = _resolve_method(method, n_points)
+
+    factor = get_factor(n_points, H, dt, method)
+
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+        if method == "fft":
+            fBm = circulant_fgn(factor, n_points, rng, size)
+        else:
+            fBm = rng.standard_normal((size, n_points)) @ factor.T
+        yield initial_price * np.exp(volatility * fBm)
+
+def simulate_paths(initial_price, n_paths, days=14, H=0.6, volatility=0.02,
+                   seed=None, chunk_size=10000, method="auto"):
+    """
+    Simulate many stock price paths sharing the same (n, H, dt)
+    initial_price: starting price
+    n_paths: number of independent paths
+    days: number of days to simulate (hourly points)
+    H: Hurst exponent (0 < H < 1)
+    volatility: price volatility
+    seed: seed for numpy.random.default_rng (int, SeedSequence or None)
+    chunk_size: paths generated per batch
+    method: "cholesky", "fft", or "auto"
+    Returns an array of shape (n_paths, days * 24).
+    """
+    paths = np.empty((n_paths, days * 24))
+    row = 0
+    for chunk in iter_path_chunks(initial_price, n_paths, days, H, volatility,
+                                  seed, chunk_size, method):
+        paths[row:row + len(chunk)] = chunk
+        row += len(chunk)
+    return paths
+
+def _setup_axes(ax, x, prices):
+    """Static decoration shared by the live and fast renderers (x in date numbers)"""
+    import matplotlib.dates as mdates
+
     ax.set_title('Fractal Stock Price Simulation (2-Week Projection)')
     ax.set_xlabel('Date')
     ax.set_ylabel('Price ($)')
     
-    # Generate initial data
-    dates, prices = simulate_stock_price(initial_price)
-    
-    # Initialize line
-    line, = ax.plot([], [], 'b-', label='Simulated Price')
-    
     # Set axis limits
-    ax.set_xlim(dates[0], dates[-1])
-    ax.set_ylim(min(prices) * 0.95, max(prices) * 1.05)
+    ax.set_xlim(x[0], x[-1])
+    ax.set_ylim(prices.min() * 0.95, prices.max() * 1.05)
     
     # Format x-axis
+    ax.xaxis.set_major_locator(mdates.AutoDateLocator())
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-    plt.xticks(rotation=45)
+    ax.tick_params(axis='x', labelrotation=45)
     
     # Add grid
     ax.grid(True, linestyle='--', alpha=0.7)
+
+def build_animation(dates, prices):
+    """
+    Classic FuncAnimation of the price line. Every frame re-sends the whole
+    history, so saving it is quadratic in the number of points; use
+    render_simulation to write files.
+    """
+    # Plotting imports stay local so headless users (sweep.py) never load a
+    # matplotlib backend
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+    import matplotlib.dates as mdates
+
+    x = mdates.date2num(dates)
+
+    # Create figure and axis
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    # Initialize line
+    line, = ax.plot([], [], 'b-', label='Simulated Price')
+    _setup_axes(ax, x, prices)
     
     # Add legend
     ax.legend()
@@ -90,22 +256,171 @@ def animate_simulation(initial_price):
         return line,
     
     def animate(frame):
-        line.set_data(dates[:frame+1], prices[:frame+1])
+        line.set_data(x[:frame+1], prices[:frame+1])
         return line,
     
     # Create animation
     anim = FuncAnimation(fig, animate, init_func=init,
-                        frames=len(dates), interval=50, blit=True)
+                        frames=len(x), interval=50, blit=True)
     
     plt.tight_layout()
+    return fig, anim
+
+def frame_indices(n, stride=1, target_frames=None):
+    """Last data index shown in each frame; always ends on the final point"""
+    if target_frames:
+        return np.unique(np.linspace(0, n - 1, min(target_frames, n)).round().astype(int))
+    idx = np.arange(0, n, stride)
+    if idx[-1] != n - 1:
+        idx = np.append(idx, n - 1)
+    return idx
+
+class PillowGifEncoder:
+    """
+    Buffers palette-quantized frames and writes one GIF on close. Pillow
+    stores only the changed bounding box of each frame after the first.
+    """
+
+    def __init__(self, path, fps, preview):
+        from PIL import Image
+
+        self.Image = Image
+        self.path = path
+        self.duration = int(round(1000 / fps))
+        # Palette taken from the finished chart so the line colour is in it
+        self.palette = Image.fromarray(preview[..., :3]).quantize(colors=128)
+        self.frames = []
+
+    def write(self, rgba):
+        # Zero-copy view of the canvas buffer; convert() makes the RGB copy
+        frame = self.Image.fromarray(rgba).convert('RGB')
+        self.frames.append(frame.quantize(palette=self.palette, dither=self.Image.Dither.NONE))
+
+    def close(self):
+        if self.frames:
+            self.frames[0].save(self.path, save_all=True, append_images=self.frames[1:],
+                                duration=self.duration, loop=0, optimize=False)
+
+class FFmpegPipeEncoder:
+    """Streams raw RGBA frames into an ffmpeg process (.mp4 or .gif)."""
+
+    def __init__(self, path, fps, size):
+        width, height = size
+        cmd = ['ffmpeg', '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{width}x{height}',
+               '-r', str(fps), '-i', '-']
+        if path.lower().endswith('.gif'):
+            cmd += ['-filter_complex', 'split[a][b];[a]palettegen[p];[b][p]paletteuse']
+        else:
+            # yuv420p needs even dimensions
+            cmd += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                    '-vcodec', 'libx264', '-pix_fmt', 'yuv420p']
+        cmd.append(path)
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, rgba):
+        self.proc.stdin.write(rgba.tobytes())
+
+    def close(self):
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {self.proc.returncode}")
+
+def open_encoder(path, fps, preview, writer="auto"):
+    """writer: "ffmpeg", "pillow", or "auto" (ffmpeg when installed)"""
+    if writer == "auto":
+        writer = "ffmpeg" if shutil.which('ffmpeg') else "pillow"
+    if writer == "ffmpeg":
+        height, width = preview.shape[:2]
+        return FFmpegPipeEncoder(path, fps, (width, height))
+    if writer == "pillow":
+        if not path.lower().endswith('.gif'):
+            raise ValueError("The pillow writer only produces .gif; install ffmpeg for video")
+        return PillowGifEncoder(path, fps, preview)
+    raise ValueError(f"Unknown writer: {writer}")
+
+def render_simulation(dates, prices, output_file, stride=1, target_frames=None,
+                      fps=20, writer="auto"):
+    """
+    Render the growing price line straight to an encoder.
+    Each frame draws only the newest segment on top of the previous frame's
+    pixels, so per-frame cost is constant instead of growing with history.
+    stride: data points advanced per frame
+    target_frames: if set, overrides stride with evenly spaced frames
+    Returns the number of frames written.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import matplotlib.dates as mdates
+
+    x = mdates.date2num(dates)
+    y = np.asarray(prices)
+    frames = frame_indices(len(x), stride, target_frames)
+
+    # Agg canvas without pyplot: no GUI backend, no figure manager
+    fig = Figure(figsize=(12, 6))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot([], [], 'b-', label='Simulated Price')  # legend entry only
+    _setup_axes(ax, x, y)
+    ax.legend()
+    fig.tight_layout()
+    segment, = ax.plot([], [], 'b-', animated=True)
+    canvas.draw()
+
+    # Preview of the finished chart for palette building, then restore
+    background = canvas.copy_from_bbox(fig.bbox)
+    segment.set_data(x, y)
+    ax.draw_artist(segment)
+    preview = np.array(canvas.buffer_rgba())
+    canvas.restore_region(background)
+
+    encoder = open_encoder(output_file, fps, preview, writer)
+    try:
+        prev = 0
+        for i in frames:
+            segment.set_data(x[prev:i + 1], y[prev:i + 1])
+            ax.draw_artist(segment)
+            encoder.write(np.asarray(canvas.buffer_rgba()))
+            prev = i
+    finally:
+        encoder.close()
+    return len(frames)
+
+def animate_simulation(initial_price, fast=True, stride=1, target_frames=None, show=True):
+    """
+    Simulate a path, save it as an animated GIF under output/ and show it.
+    fast: write the file with render_simulation instead of FuncAnimation.save
+    stride / target_frames: frame sampling for the fast renderer
+    """
+    # Create output directory if it doesn't exist
+    output_dir = 'output'
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    
+    # Generate timestamp for filename
+    timestamp = datetime.now().strftime('%m_%d_%Y')
+    output_file = os.path.join(output_dir, f'stock_simulation_{timestamp}.gif')
+    
+    # Generate initial data
+    dates, prices = simulate_stock_price(initial_price)
     
     # Save the animation as GIF
     print(f"Saving animation to {output_file}...")
-    anim.save(output_file, writer='pillow')
+    if fast:
+        render_simulation(dates, prices, output_file, stride, target_frames)
+    else:
+        fig, anim = build_animation(dates, prices)
+        anim.save(output_file, writer='pillow')
     print("Animation saved successfully!")
     
     # Show the plot
-    plt.show()
+    if show:
+        import matplotlib.pyplot as plt
+
+        if fast:
+            fig, anim = build_animation(dates, prices)
+        plt.show()
 
 def main():
     try:
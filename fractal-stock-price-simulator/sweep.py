@@ -0,0 +1,210 @@
+# Headless Hurst-exponent / volatility sweep for the fractal stock simulator.
+# Runs simulate_paths over a parameter grid in a process pool and streams one
+# row of summary statistics per task to CSV or Parquet as tasks finish.
+#
+# Example:
+#   python sweep.py --hurst 0.3:0.8:0.1 --volatility 0.01,0.02 --days 14,30 \
+#       --seeds 0,1 --paths 2000 --output output/sweep.csv
+
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+FIELDS = [
+    "hurst", "volatility", "days", "seed", "n_paths",
+    "terminal_mean", "terminal_std", "terminal_p05", "terminal_p50", "terminal_p95",
+    "max_drawdown_mean", "max_drawdown_p95",
+    "hurst_est_mean", "hurst_est_std", "elapsed_s",
+]
+INT_FIELDS = {"days", "seed", "n_paths"}
+
+# ─── GRID ─────────────────────────────────────────────────────────────────────
+def parse_grid(text, cast=float):
+    """Parse "a,b,c" or an inclusive range "start:stop:step" into a list."""
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        values = np.arange(start, stop + step / 2, step)
+        return [cast(round(v, 10)) for v in values]
+    return [cast(v) for v in text.split(",") if v.strip()]
+
+def build_tasks(hursts, volatilities, days_list, seeds):
+    """
+    One task per grid point. Each task gets its own SeedSequence derived from
+    (seed, grid index), so results do not depend on worker count or order.
+    """
+    tasks = []
+    grid = list(itertools.product(hursts, volatilities, days_list))
+    for seed in seeds:
+        for index, (H, volatility, days) in enumerate(grid):
+            seed_seq = np.random.SeedSequence(entropy=seed, spawn_key=(index,))
+            tasks.append((H, volatility, days, seed, seed_seq))
+    return tasks
+
+# ─── STATISTICS ───────────────────────────────────────────────────────────────
+def max_drawdown(paths):
+    """Largest peak-to-trough fall of each path, as a fraction of the peak."""
+    peaks = np.maximum.accumulate(paths, axis=1)
+    return np.max(1 - paths / peaks, axis=1)
+
+def estimate_hurst(paths, initial_price, volatility):
+    """
+    Per-path Hurst estimate from the variogram of the underlying fBm:
+    E[(B(t+k) - B(t))^2] ~ k^(2H), so H is half the log-log slope.
+    """
+    fgn = np.log(paths / initial_price) / volatility
+    fbm = np.cumsum(fgn, axis=1)
+    n = fbm.shape[1]
+    lags = np.unique(np.geomspace(1, max(n // 4, 2), 12).astype(int))
+    log_var = np.empty((len(lags), len(fbm)))
+    for i, lag in enumerate(lags):
+        diffs = fbm[:, lag:] - fbm[:, :-lag]
+        log_var[i] = np.log(np.mean(diffs**2, axis=1))
+    log_lags = np.log(lags) - np.log(lags).mean()
+    slope = log_lags @ (log_var - log_var.mean(axis=0)) / (log_lags @ log_lags)
+    return slope / 2
+
+def run_task(task, initial_price, n_paths, chunk_size):
+    """Simulate one grid point chunk by chunk and reduce it to summary stats."""
+    import fractal_stock_simulator as fss
+
+    H, volatility, days, seed, seed_seq = task
+    start = time.perf_counter()
+    terminal, drawdown, hurst = [], [], []
+    for paths in fss.iter_path_chunks(initial_price, n_paths, days, H, volatility,
+                                      seed=seed_seq, chunk_size=chunk_size):
+        terminal.append(paths[:, -1])
+        drawdown.append(max_drawdown(paths))
+        hurst.append(estimate_hurst(paths, initial_price, volatility))
+    terminal = np.concatenate(terminal)
+    drawdown = np.concatenate(drawdown)
+    hurst = np.concatenate(hurst)
+
+    p05, p50, p95 = np.percentile(terminal, [5, 50, 95])
+    return {
+        "hurst": H, "volatility": volatility, "days": days, "seed": seed,
+        "n_paths": n_paths,
+        "terminal_mean": terminal.mean(), "terminal_std": terminal.std(),
+        "terminal_p05": p05, "terminal_p50": p50, "terminal_p95": p95,
+        "max_drawdown_mean": drawdown.mean(),
+        "max_drawdown_p95": np.percentile(drawdown, 95),
+        "hurst_est_mean": hurst.mean(), "hurst_est_std": hurst.std(),
+        "elapsed_s": time.perf_counter() - start,
+    }
+
+def init_worker(cache_dir):
+    """Point each worker's factor cache at the shared on-disk store."""
+    if cache_dir:
+        import fractal_stock_simulator as fss
+        from factor_cache import FactorCache
+        fss.FACTOR_CACHE = FactorCache(cache_dir=cache_dir)
+
+# ─── OUTPUT ───────────────────────────────────────────────────────────────────
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class ParquetSink:
+    """Buffers rows into small row groups; pyarrow is only needed for .parquet."""
+
+    def __init__(self, path, rows_per_group=64):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)") from e
+        self.pa = pa
+        self.schema = pa.schema([(name, pa.int64() if name in INT_FIELDS else pa.float64())
+                                 for name in FIELDS])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.rows_per_group = rows_per_group
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.rows_per_group:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            columns = {name: [r[name] for r in self.rows] for name in FIELDS}
+            self.writer.write_table(self.pa.table(columns, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+def open_sink(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".parquet"):
+        return ParquetSink(path)
+    return CsvSink(path)
+
+# ─── MAIN ─────────────────────────────────────────────────────────────────────
+def run_sweep(tasks, output, initial_price=100.0, n_paths=1000, chunk_size=1000,
+              workers=None, cache_dir=None):
+    workers = workers or os.cpu_count()
+
+    # One BLAS/FFT thread per worker process; the pool supplies the parallelism.
+    # Workers are spawned so they import numpy after these are set.
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, "1")
+
+    sink = open_sink(output)
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=init_worker,
+                                 initargs=(cache_dir,)) as pool:
+            futures = [pool.submit(run_task, task, initial_price, n_paths, chunk_size)
+                       for task in tasks]
+            for done, future in enumerate(as_completed(futures), 1):
+                row = future.result()
+                sink.write(row)
+                print(f"[{done}/{len(tasks)}] H={row['hurst']:.3f} "
+                      f"vol={row['volatility']:.4f} days={row['days']} seed={row['seed']} "
+                      f"-> H_est={row['hurst_est_mean']:.3f} ({row['elapsed_s']:.2f}s)")
+    finally:
+        sink.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Sweep finished: {len(tasks)} tasks on {workers} workers in {elapsed:.2f}s "
+          f"({len(tasks) / elapsed:.2f} tasks/s). Results saved to {output}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless fBm parameter sweep")
+    parser.add_argument("--hurst", default="0.3,0.5,0.7", help="H values or start:stop:step")
+    parser.add_argument("--volatility", default="0.02", help="volatility values")
+    parser.add_argument("--days", default="14", help="horizons in days")
+    parser.add_argument("--seeds", default="0", help="base seeds (one replicate each)")
+    parser.add_argument("--paths", type=int, default=1000, help="paths per task")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="paths per batch")
+    parser.add_argument("--initial-price", type=float, default=100.0)
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--cache-dir", default=None, help="shared on-disk factor cache")
+    parser.add_argument("--output", default=os.path.join("output", "sweep.csv"),
+                        help=".csv or .parquet")
+    args = parser.parse_args()
+
+    tasks = build_tasks(parse_grid(args.hurst), parse_grid(args.volatility),
+                        parse_grid(args.days, int), parse_grid(args.seeds, int))
+    run_sweep(tasks, args.output, args.initial_price, args.paths, args.chunk_size,
+              args.workers, args.cache_dir)
+
+if __name__ == "__main__":
+    main()
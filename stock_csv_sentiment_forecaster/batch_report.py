@@ -0,0 +1,162 @@
+# Parallel momentum report generator.
+# Computes indicators and renders the 2x2 momentum figure for many tickers in
+# a process pool (Agg backend, one reused figure per worker), then writes a
+# summary CSV of current and projected sentiment plus per-stage timings.
+#
+# Examples:
+#   python batch_report.py SPY.csv data/*.csv --output-dir reports
+#   python batch_report.py --tickers SPY QQQ IWM --data-dir data --format png svg
+
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+STAGES = ['load', 'indicators', 'projections', 'render', 'save']
+
+# Per-worker figure, created once and redrawn for every ticker
+_FIGURE = None
+
+def init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+def _get_figure():
+    global _FIGURE
+    if _FIGURE is None:
+        from momentum_analysis import create_momentum_figure
+        _FIGURE = create_momentum_figure(headless=True)
+    return _FIGURE
+
+def process_ticker(ticker, csv_path, output_dir, formats, months_to_show=3):
+    """Load, analyze and render one ticker; returns a summary row with timings (ms)"""
+    import momentum_analysis as ma
+
+    timings = {}
+    row = {'ticker': ticker, 'source': csv_path}
+    try:
+        start = time.perf_counter()
+        df = ma.load_price_data(csv_path, months_to_show)
+        close, volume = df['Close/Last'], df['Volume']
+        timings['load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indicators = ma.calculate_indicators(close)
+        timings['indicators'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        projections = ma.calculate_ticker_projections(close, volume, indicators)
+        timings['projections'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fig, axes, ax2 = _get_figure()
+        ma.draw_momentum_analysis(fig, axes, ax2, close, volume, indicators, projections,
+                                  ticker, months_to_show)
+        timings['render'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        figures = []
+        for fmt in formats:
+            path = os.path.join(output_dir, f"{ticker}_momentum.{fmt}")
+            fig.savefig(path, format=fmt)
+            figures.append(path)
+        timings['save'] = time.perf_counter() - start
+
+        current = indicators['sentiment'].iloc[-1]
+        projected = projections['sentiment'][-1]
+        row.update({
+            'date': close.index[-1].strftime('%Y-%m-%d'),
+            'close': close.iloc[-1],
+            'current_sentiment': round(float(current), 2),
+            'current_label': ma.get_sentiment_label(current),
+            'projected_sentiment': round(float(projected), 2),
+            'projected_label': ma.get_sentiment_label(projected),
+            'figures': ';'.join(figures),
+            'error': '',
+        })
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+
+    for stage in STAGES:
+        row[f'{stage}_ms'] = round(timings.get(stage, 0.0) * 1000, 1)
+    return row
+
+def resolve_inputs(paths, tickers, data_dir):
+    """Map ticker -> CSV path from explicit files, directories and ticker names"""
+    from momentum_analysis import ticker_from_path
+
+    inputs = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for csv_path in sorted(glob.glob(os.path.join(path, '*.csv'))):
+                inputs[ticker_from_path(csv_path)] = csv_path
+        else:
+            inputs[ticker_from_path(path)] = path
+    for ticker in tickers:
+        inputs[ticker.upper()] = os.path.join(data_dir, f"{ticker.upper()}.csv")
+    return inputs
+
+def print_timings(rows, wall_time, workers):
+    ok = [r for r in rows if not r['error']]
+    print(f"\n⏱  Stage timings over {len(ok)} tickers")
+    print(f"{'stage':<12}{'total s':>10}{'mean ms':>10}{'max ms':>10}")
+    for stage in STAGES:
+        values = [r[f'{stage}_ms'] for r in ok] or [0.0]
+        print(f"{stage:<12}{sum(values) / 1000:>10.2f}{sum(values) / len(values):>10.1f}{max(values):>10.1f}")
+    print(f"Wall time {wall_time:.2f}s on {workers} workers "
+          f"({len(rows) / wall_time:.1f} tickers/s)")
+
+def run_batch(inputs, output_dir, formats=('png',), months_to_show=3, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count()
+    rows = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=init_worker) as pool:
+        futures = [pool.submit(process_ticker, ticker, path, output_dir, formats, months_to_show)
+                   for ticker, path in inputs.items()]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            if row['error']:
+                print(f"❌ {row['ticker']}: {row['error']}")
+            else:
+                print(f"✅ {row['ticker']}: {row['current_label']} -> {row['projected_label']}")
+    wall_time = time.perf_counter() - start
+
+    rows.sort(key=lambda r: r['ticker'])
+    summary_path = os.path.join(output_dir, 'summary.csv')
+    fields = ['ticker', 'date', 'close', 'current_sentiment', 'current_label',
+              'projected_sentiment', 'projected_label', 'figures', 'source', 'error'] + \
+             [f'{stage}_ms' for stage in STAGES]
+    with open(summary_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print_timings(rows, wall_time, workers)
+    print(f"Summary saved to {summary_path}")
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch momentum analysis reports")
+    parser.add_argument('paths', nargs='*', help="CSV files or directories of CSVs")
+    parser.add_argument('--tickers', nargs='*', default=[], help="tickers looked up in --data-dir")
+    parser.add_argument('--data-dir', default='.', help="directory holding <TICKER>.csv")
+    parser.add_argument('--output-dir', default='reports')
+    parser.add_argument('--format', nargs='+', default=['png'], choices=['png', 'svg'])
+    parser.add_argument('--months', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None, help="default: all cores")
+    args = parser.parse_args()
+
+    inputs = resolve_inputs(args.paths, args.tickers, args.data_dir)
+    if not inputs:
+        parser.error("no CSV files or tickers given")
+    run_batch(inputs, args.output_dir, args.format, args.months, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import stats
 from datetime import datetime, timedelta
-from sklearn.linear_model import LinearRegression
+from price_cache import load_price_history
 
 def calculate_rsi(data, periods=14):
     """Calculate Relative Strength Index"""
@@ -72,30 +73,54 @@ def get_sentiment_label(score):
     else:
         return "Extremely Bearish"
 
+def calculate_projections_batch(frame, days_to_project=7):
+    """
+    Least-squares trend projections for many series at once.
+    Each column is fitted against its own index of non-NaN points using
+    closed-form sums, then scaled so the projection starts at the column's
+    last actual value. Returns a (days_to_project x columns) array.
+    """
+    values = np.asarray(frame, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n_rows = len(values)
+    last = values[-1]
+
+    # Remove NaN values per column: x counts only the valid points
+    mask = ~np.isnan(values)
+    n = mask.sum(axis=0)
+    x = np.cumsum(mask, axis=0) - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = (n - 1) / 2
+        y_mean = np.where(mask, values, 0.0).sum(axis=0) / n
+        sxx = n * (n**2 - 1) / 12  # sum of (x - x_mean)^2 for x = 0..n-1
+        sxy = np.where(mask, (x - x_mean) * (values - y_mean), 0.0).sum(axis=0)
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+
+        # Project future dates starting from the last point of original data
+        x_future = np.arange(n_rows, n_rows + days_to_project)[:, None]
+        y_future = intercept + slope * x_future
+
+        # Ensure the projection starts from the last actual value
+        y_future = y_future * (last / y_future[0])
+
+    # Too few points for a trend: repeat the last value
+    return np.where(n >= 2, y_future, last)
+
 def calculate_projections(data, days_to_project=7):
     """Calculate projections for the next week using linear regression"""
-    # Remove NaN values for projection calculation
-    valid_data = data.dropna()
-    if len(valid_data) < 2:
-        return np.array([data.iloc[-1]] * days_to_project)
-        
-    X = np.arange(len(valid_data)).reshape(-1, 1)
-    y = valid_data.values.reshape(-1, 1)
-    
-    model = LinearRegression()
-    model.fit(X, y)
-    
-    # Project future dates starting from the last point of original data
-    X_future = np.arange(len(data), len(data) + days_to_project).reshape(-1, 1)
-    y_future = model.predict(X_future)
-    
-    # Ensure the projection starts from the last actual value
-    y_future = y_future * (data.iloc[-1] / y_future[0])  # Scale to match the last actual value
-    
-    return y_future.flatten()
+    return calculate_projections_batch(data, days_to_project)[:, 0]
+
+def load_price_data(csv_path, months_to_show=3, use_cache=True):
+    """
+    Load one ticker CSV, indexed by date and trimmed to the last few months.
+    With use_cache the CSV is parsed once into the columnar cache
+    (price_cache.py) and later calls read only the trimmed date range.
+    """
+    if use_cache:
+        return load_price_history(csv_path, months=months_to_show)
 
-def plot_momentum_analysis(csv_path, months_to_show=3):
-    """Generate comprehensive momentum analysis plots"""
     # Read data
     df = pd.read_csv(csv_path)
     df['Date'] = pd.to_datetime(df['Date'])
@@ -107,41 +132,198 @@ def plot_momentum_analysis(csv_path, months_to_show=3):
     
     # Filter last 3 months
     start_date = df.index[-1] - pd.DateOffset(months=months_to_show)
-    df = df[df.index >= start_date]
+    return df[df.index >= start_date]
+
+def ticker_from_path(csv_path):
+    """Ticker symbol from a CSV file name, e.g. data/spy.csv -> SPY"""
+    return os.path.splitext(os.path.basename(csv_path))[0].upper()
+
+def calculate_indicators(close):
+    """
+    Compute every indicator for a price Series or a wide (date x ticker)
+    DataFrame in one vectorized pass. Returns a dict of same-shaped results.
+    """
+    macd, signal = calculate_macd(close)
+    upper_band, sma, lower_band = calculate_bollinger_bands(close)
+    return {
+        'rsi': calculate_rsi(close),
+        'macd': macd,
+        'signal': signal,
+        'upper_band': upper_band,
+        'sma': sma,
+        'lower_band': lower_band,
+        'sentiment': calculate_sentiment(close),
+    }
+
+def date_groups(close):
+    """
+    (row mask, tickers) for each set of tickers that trade on exactly the same
+    dates in a wide close frame. Rolling indicators count rows, so a ticker
+    must only see its own dates; most universes form a single group.
+    """
+    valid = close.notna()
+    groups = {}
+    for ticker in close.columns:
+        rows = valid[ticker].to_numpy()
+        groups.setdefault(rows.tobytes(), (rows, []))[1].append(ticker)
+    return list(groups.values())
+
+def calculate_universe_indicators(close):
+    """
+    calculate_indicators for a wide (date x ticker) frame whose tickers may
+    miss dates other tickers have. Each date group is computed in one
+    vectorized pass over its own rows, then aligned back to the shared index.
+    """
+    parts = [calculate_indicators(close.loc[rows, tickers]) for rows, tickers in date_groups(close)]
+    return {name: pd.concat([part[name] for part in parts], axis=1)
+                    .reindex(index=close.index, columns=close.columns)
+            for name in parts[0]}
+
+def calculate_universe_projections(frame, close, days_to_project=7):
+    """Final projected value of each column of frame, fitted over its ticker's own dates"""
+    projected = pd.Series(np.nan, index=frame.columns)
+    for rows, tickers in date_groups(close):
+        projected[tickers] = calculate_projections_batch(frame.loc[rows, tickers], days_to_project)[-1]
+    return projected
+
+def load_universe(csv_paths, months_to_show=3, use_cache=True):
+    """
+    Load many ticker CSVs into wide (date x ticker) Close and Volume frames.
+    csv_paths: list of CSV paths (ticker taken from the file name) or a
+    {ticker: path} dict. Each ticker is filled only within its own history;
+    dates it has no row for stay NaN (see calculate_universe_indicators).
+    """
+    if not isinstance(csv_paths, dict):
+        csv_paths = {ticker_from_path(p): p for p in csv_paths}
+
+    closes, volumes = {}, {}
+    for ticker, path in csv_paths.items():
+        if use_cache:
+            df = load_price_history(path, ['Close/Last', 'Volume'], months=months_to_show)
+        else:
+            df = pd.read_csv(path, usecols=['Date', 'Close/Last', 'Volume'])
+            df['Date'] = pd.to_datetime(df['Date'])
+            df = df.set_index('Date').sort_index().ffill().bfill()
+        closes[ticker] = df['Close/Last']
+        volumes[ticker] = df['Volume']
+
+    close = pd.DataFrame(closes)
+    volume = pd.DataFrame(volumes)
+
+    # Same window for every ticker, anchored on the latest date in the universe
+    start_date = close.index[-1] - pd.DateOffset(months=months_to_show)
+    keep = close.index >= start_date
+    return close[keep], volume[keep]
+
+def indicators_to_long(indicators):
+    """Stack wide indicator frames into a tidy (Date, Ticker, indicator...) table"""
+    long = pd.concat({name: frame.stack() for name, frame in indicators.items()}, axis=1)
+    long.index.names = ['Date', 'Ticker']
+    return long.reset_index()
+
+def analyze_universe(csv_paths, months_to_show=3, plot_tickers=(), use_cache=True):
+    """
+    Vectorized momentum analysis over many tickers.
+    Returns a tidy table with one row per ticker holding the latest close,
+    indicator values, sentiment label and 1-week projected close and
+    sentiment. Figures are drawn only for the
+    tickers listed in plot_tickers and returned as {ticker: fig}.
+    """
+    close, volume = load_universe(csv_paths, months_to_show, use_cache)
+    indicators = calculate_universe_indicators(close)
+
+    # Latest valid value of each column (tickers may end on different dates)
+    last_date = close.apply(pd.Series.last_valid_index)
+    latest = pd.DataFrame({name: frame.ffill().iloc[-1] for name, frame in indicators.items()})
+    latest.insert(0, 'close', close.ffill().iloc[-1])
+    latest.insert(0, 'date', last_date)
+    latest['sentiment_label'] = latest['sentiment'].map(get_sentiment_label)
+
+    # Projections fitted over each ticker's own rows
+    latest['projected_close'] = calculate_universe_projections(close, close)
+    latest['projected_sentiment'] = calculate_universe_projections(indicators['sentiment'], close)
+    latest['projected_sentiment_label'] = latest['projected_sentiment'].map(get_sentiment_label)
+    latest.index.name = 'ticker'
+
+    figures = {}
+    for ticker in plot_tickers:
+        rows = close[ticker].notna()
+        figures[ticker] = plot_ticker(close.loc[rows, ticker], volume.loc[rows, ticker],
+                                      {name: frame.loc[rows, ticker] for name, frame in indicators.items()},
+                                      ticker, months_to_show)
+    return latest.reset_index(), figures
+
+def plot_momentum_analysis(csv_path, months_to_show=3, use_cache=True):
+    """Generate comprehensive momentum analysis plots"""
+    df = load_price_data(csv_path, months_to_show, use_cache)
     
     # Calculate indicators
-    rsi = calculate_rsi(df['Close/Last'])
-    macd, signal = calculate_macd(df['Close/Last'])
-    upper_band, sma, lower_band = calculate_bollinger_bands(df['Close/Last'])
-    sentiment = calculate_sentiment(df['Close/Last'])
-    
-    # Calculate projections
-    price_proj = calculate_projections(df['Close/Last'])
-    volume_proj = calculate_projections(df['Volume'])
-    rsi_proj = calculate_projections(rsi)
-    macd_proj = calculate_projections(macd)
-    signal_proj = calculate_projections(signal)
-    sentiment_proj = calculate_projections(sentiment)
+    indicators = calculate_indicators(df['Close/Last'])
+    return plot_ticker(df['Close/Last'], df['Volume'], indicators,
+                       ticker_from_path(csv_path), months_to_show)
+
+def calculate_ticker_projections(close, volume, indicators, days_to_project=7):
+    """1-week projections of price, volume, RSI, MACD, signal and sentiment in one batched fit"""
+    series = [close, volume, indicators['rsi'], indicators['macd'],
+              indicators['signal'], indicators['sentiment']]
+    projected = calculate_projections_batch(np.column_stack(series), days_to_project)
+    projections = dict(zip(['price', 'volume', 'rsi', 'macd', 'signal', 'sentiment'], projected.T))
     
     # Create projection dates
-    proj_dates = pd.date_range(start=df.index[-1] + pd.Timedelta(days=1), periods=7, freq='D')
+    projections['dates'] = pd.date_range(start=close.index[-1] + pd.Timedelta(days=1),
+                                         periods=days_to_project, freq='D')
+    return projections
+
+def create_momentum_figure(headless=False):
+    """
+    Create the 2x2 momentum figure and the twin sentiment axis.
+    headless: build on a bare Agg canvas instead of a pyplot-managed window.
+    """
+    if headless:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure(figsize=(15, 12))
+        FigureCanvasAgg(fig)
+        axes = fig.subplots(2, 2)
+    else:
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+    return fig, axes, axes[1, 1].twinx()
+
+def draw_momentum_analysis(fig, axes, ax2, close, volume, indicators, projections,
+                           ticker, months_to_show=3):
+    """(Re)draw every panel into existing axes, so one figure can serve many tickers"""
+    rsi = indicators['rsi']
+    macd, signal = indicators['macd'], indicators['signal']
+    upper_band, sma, lower_band = indicators['upper_band'], indicators['sma'], indicators['lower_band']
+    sentiment = indicators['sentiment']
+    proj_dates = projections['dates']
+    price_proj, volume_proj = projections['price'], projections['volume']
+    rsi_proj, macd_proj, signal_proj = projections['rsi'], projections['macd'], projections['signal']
+    sentiment_proj = projections['sentiment']
     
-    # Create figure with subplots
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-    fig.suptitle('SPY Momentum Analysis (Last 3 Months with 1-Week Projection)', fontsize=16)
+    for ax in (*axes.flat, ax2):
+        ax.cla()
+    # cla() resets the twin axis to a left-hand, opaque axis; restore twinx setup
+    ax2.yaxis.tick_right()
+    ax2.yaxis.set_label_position('right')
+    ax2.yaxis.set_offset_position('right')
+    ax2.xaxis.set_visible(False)
+    ax2.patch.set_visible(False)
+    
+    fig.suptitle(f'{ticker} Momentum Analysis (Last {months_to_show} Months with 1-Week Projection)', fontsize=16)
     
     # Plot 1: Price and Bollinger Bands
-    axes[0, 0].plot(df.index, df['Close/Last'], label='Price', color='blue')
-    axes[0, 0].plot(df.index, upper_band, '--', label='Upper BB', color='gray', alpha=0.5)
-    axes[0, 0].plot(df.index, sma, '--', label='SMA', color='orange', alpha=0.5)
-    axes[0, 0].plot(df.index, lower_band, '--', label='Lower BB', color='gray', alpha=0.5)
+    axes[0, 0].plot(close.index, close, label='Price', color='blue')
+    axes[0, 0].plot(close.index, upper_band, '--', label='Upper BB', color='gray', alpha=0.5)
+    axes[0, 0].plot(close.index, sma, '--', label='SMA', color='orange', alpha=0.5)
+    axes[0, 0].plot(close.index, lower_band, '--', label='Lower BB', color='gray', alpha=0.5)
     axes[0, 0].plot(proj_dates, price_proj, '--', label='Price Projection', color='red', alpha=0.7)
     axes[0, 0].set_title('Price and Bollinger Bands')
     axes[0, 0].legend()
     axes[0, 0].tick_params(axis='x', rotation=45)
     
     # Plot 2: RSI
-    axes[0, 1].plot(df.index, rsi, color='purple', label='RSI')
+    axes[0, 1].plot(close.index, rsi, color='purple', label='RSI')
     axes[0, 1].plot(proj_dates, rsi_proj, '--', label='RSI Projection', color='red', alpha=0.7)
     axes[0, 1].axhline(y=70, color='r', linestyle='--')
     axes[0, 1].axhline(y=30, color='g', linestyle='--')
@@ -151,8 +333,8 @@ def plot_momentum_analysis(csv_path, months_to_show=3):
     axes[0, 1].tick_params(axis='x', rotation=45)
     
     # Plot 3: MACD
-    axes[1, 0].plot(df.index, macd, label='MACD', color='blue')
-    axes[1, 0].plot(df.index, signal, label='Signal', color='orange')
+    axes[1, 0].plot(close.index, macd, label='MACD', color='blue')
+    axes[1, 0].plot(close.index, signal, label='Signal', color='orange')
     axes[1, 0].plot(proj_dates, macd_proj, '--', label='MACD Projection', color='red', alpha=0.7)
     axes[1, 0].plot(proj_dates, signal_proj, '--', label='Signal Projection', color='purple', alpha=0.7)
     axes[1, 0].set_title('MACD')
@@ -161,9 +343,8 @@ def plot_momentum_analysis(csv_path, months_to_show=3):
     
     # Plot 4: Volume and Sentiment
     ax1 = axes[1, 1]
-    ax2 = ax1.twinx()
-    ax1.bar(df.index, df['Volume'], alpha=0.3, color='gray', label='Volume')
-    ax2.plot(df.index, sentiment, color='blue', label='Sentiment')
+    ax1.bar(close.index, volume, alpha=0.3, color='gray', label='Volume')
+    ax2.plot(close.index, sentiment, color='blue', label='Sentiment')
     ax1.bar(proj_dates, volume_proj, alpha=0.3, color='lightcoral', label='Volume Projection')
     ax2.plot(proj_dates, sentiment_proj, '--', color='red', label='Sentiment Projection', alpha=0.7)
     ax1.set_title('Volume and Sentiment')
@@ -172,12 +353,25 @@ def plot_momentum_analysis(csv_path, months_to_show=3):
     ax2.set_ylim(-100, 100)
     ax1.tick_params(axis='x', rotation=45)
     
-    # Adjust layout
-    plt.tight_layout()
+    # Adjust layout. tight_layout starts from the current subplot parameters, so
+    # put back the defaults first or a reused figure drifts from a fresh one
+    fig.subplots_adjust(**{name: plt.rcParams[f'figure.subplot.{name}']
+                           for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+    fig.tight_layout()
+
+def plot_ticker(close, volume, indicators, ticker, months_to_show=3):
+    """Draw the 2x2 momentum figure for one ticker from precomputed indicators"""
+    # Calculate projections (one batched fit for all six series)
+    projections = calculate_ticker_projections(close, volume, indicators)
+    
+    # Create figure with subplots
+    fig, axes, ax2 = create_momentum_figure()
+    draw_momentum_analysis(fig, axes, ax2, close, volume, indicators, projections,
+                           ticker, months_to_show)
     
     # Print current sentiment and projected sentiment
-    current_sentiment = sentiment.iloc[-1]
-    projected_sentiment = sentiment_proj[-1]
+    current_sentiment = indicators['sentiment'].iloc[-1]
+    projected_sentiment = projections['sentiment'][-1]
     print(f"\nCurrent Sentiment Score: {current_sentiment:.2f}")
     print(f"Current Sentiment Label: {get_sentiment_label(current_sentiment)}")
     print(f"\nProjected Sentiment (1 week): {projected_sentiment:.2f}")
@@ -0,0 +1,145 @@
+import os
+import re
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Columnar cache for Nasdaq price-history CSVs.
+# Each CSV is parsed once into one .npy file per column plus a sorted Date
+# index, stored under <csv dir>/.price_cache/. Later loads memory-map only the
+# requested columns and slice the requested date range by binary search.
+
+CACHE_VERSION = 1
+
+def _file_sha1(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_path(csv_path, cache_dir=None):
+    csv_path = os.path.abspath(csv_path)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(csv_path), '.price_cache')
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    key = hashlib.sha1(csv_path.encode()).hexdigest()[:8]
+    return os.path.join(cache_dir, f"{stem}-{key}")
+
+def _column_file(column):
+    """'Close/Last' -> 'Close_Last.npy'"""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', column) + '.npy'
+
+def _as_index_time(value, dtype):
+    """Convert a date-like value to the cached index resolution for searchsorted"""
+    return pd.Timestamp(value).to_datetime64().astype(dtype)
+
+def _save_array(path, array):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+def _read_meta(path):
+    try:
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == CACHE_VERSION else None
+
+def _write_meta(path, meta):
+    tmp_path = os.path.join(path, f"meta.json.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, 'meta.json'))
+
+def _is_fresh(meta, csv_path, path):
+    """Cheap size/mtime check first, content hash only when those differ"""
+    st = os.stat(csv_path)
+    if meta['size'] == st.st_size and meta['mtime_ns'] == st.st_mtime_ns:
+        return True
+    if meta['size'] == st.st_size and meta['sha1'] == _file_sha1(csv_path):
+        # Touched but unchanged: remember the new mtime to skip hashing next time
+        meta['mtime_ns'] = st.st_mtime_ns
+        _write_meta(path, meta)
+        return True
+    return False
+
+def build_cache(csv_path, cache_dir=None):
+    """Parse csv_path once and write its typed columns; returns the cache metadata"""
+    st = os.stat(csv_path)
+    sha1 = _file_sha1(csv_path)
+
+    path = _cache_path(csv_path, cache_dir)
+    os.makedirs(path, exist_ok=True)
+    meta_file = os.path.join(path, 'meta.json')
+    if os.path.exists(meta_file):
+        os.remove(meta_file)  # mark incomplete while columns are rewritten
+
+    # Same preparation as momentum_analysis.load_price_data, on the full history
+    df = pd.read_csv(csv_path)
+    df['Date'] = pd.to_datetime(df['Date'])
+    df.set_index('Date', inplace=True)
+    df.sort_index(inplace=True)
+    df = df.ffill().bfill()
+
+    _save_array(os.path.join(path, 'Date.npy'), df.index.values)
+    columns = {}
+    for column in df.columns:
+        if pd.api.types.is_numeric_dtype(df[column]):
+            file_name = _column_file(column)
+            _save_array(os.path.join(path, file_name), df[column].to_numpy())
+            columns[column] = file_name
+
+    meta = {
+        'version': CACHE_VERSION,
+        'source': os.path.abspath(csv_path),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'sha1': sha1,
+        'rows': len(df),
+        'columns': columns,
+    }
+    _write_meta(path, meta)
+    return meta
+
+def load_price_history(csv_path, columns=None, start=None, end=None, months=None,
+                       cache_dir=None):
+    """
+    Load price history through the columnar cache, rebuilding it if the CSV changed.
+    columns: column names to read (default: all numeric columns)
+    start, end: inclusive date bounds (anything pd.Timestamp accepts)
+    months: keep only the last N months before end (or the last date)
+    Returns a DataFrame indexed by Date, like load_price_data.
+    """
+    path = _cache_path(csv_path, cache_dir)
+    meta = _read_meta(path)
+    if meta is None or not _is_fresh(meta, csv_path, path):
+        meta = build_cache(csv_path, cache_dir)
+
+    dates = np.load(os.path.join(path, 'Date.npy'), mmap_mode='r')
+    if len(dates) == 0:
+        raise ValueError(f"No rows in {csv_path}")
+
+    # Binary search on the sorted index instead of a boolean scan
+    hi = len(dates) if end is None else np.searchsorted(
+        dates, _as_index_time(end, dates.dtype), side='right')
+    if months is not None:
+        anchor = pd.Timestamp(dates[hi - 1]) if end is None else pd.Timestamp(end)
+        start_date = anchor - pd.DateOffset(months=months)
+        start = start_date if start is None else max(pd.Timestamp(start), start_date)
+    lo = 0 if start is None else np.searchsorted(
+        dates, _as_index_time(start, dates.dtype), side='left')
+
+    if columns is None:
+        columns = list(meta['columns'])
+    data = {}
+    for column in columns:
+        if column not in meta['columns']:
+            raise KeyError(f"Column {column!r} not cached for {csv_path}")
+        values = np.load(os.path.join(path, meta['columns'][column]), mmap_mode='r')
+        data[column] = np.array(values[lo:hi])
+
+    index = pd.DatetimeIndex(np.array(dates[lo:hi]), name='Date')
+    return pd.DataFrame(data, index=index)
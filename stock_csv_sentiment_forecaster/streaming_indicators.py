@@ -0,0 +1,202 @@
+import math
+import numbers
+from collections import deque
+import numpy as np
+
+# Stateful O(1)-per-bar versions of the indicators in momentum_analysis.py.
+# Feeding a price series one bar at a time through update() reproduces the
+# batch functions (calculate_rsi, calculate_macd, calculate_bollinger_bands,
+# calculate_sentiment) to floating-point precision, including NaN warm-up.
+
+NAN = float('nan')
+
+class RollingWindow:
+    """Fixed-size ring buffer with running sum and sum of squares"""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = [0.0] * size
+        self.count = 0
+        self.pos = 0
+        self.shift = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.pushes_since_resync = 0
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    def push(self, x):
+        if self.shift is None:
+            self.shift = x
+        old = self.values[self.pos]
+        self.values[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        else:
+            old_d = old - self.shift
+            self.total -= old_d
+            self.total_sq -= old_d * old_d
+        d = x - self.shift
+        self.total += d
+        self.total_sq += d * d
+
+        # Re-anchor the shift on the current window and re-sum once per window:
+        # amortized O(1), and it stops rounding error from accumulating
+        self.pushes_since_resync += 1
+        if self.pushes_since_resync >= self.size:
+            self._resync()
+
+    def _resync(self):
+        window = self.values if self.full else self.values[:self.count]
+        self.shift = window[(self.pos - 1) % self.size] if self.full else window[-1]
+        self.total = math.fsum(v - self.shift for v in window)
+        self.total_sq = math.fsum((v - self.shift) ** 2 for v in window)
+        self.pushes_since_resync = 0
+
+    def mean(self):
+        if not self.full:
+            return NAN
+        return self.shift + self.total / self.size
+
+    def std(self):
+        """Sample standard deviation (ddof=1), like pandas rolling().std()"""
+        if not self.full or self.size < 2:
+            return NAN
+        var = (self.total_sq - self.total * self.total / self.size) / (self.size - 1)
+        return math.sqrt(max(var, 0.0))
+
+class StreamingEWM:
+    """Exponential moving average with pandas ewm(span=..., adjust=False) semantics"""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1)
+        self.old_wt_factor = 1.0 - self.alpha
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = x
+        else:
+            # Same arithmetic as pandas' adjust=False recursion
+            self.value = ((self.old_wt_factor * self.value + self.alpha * x)
+                          / (self.old_wt_factor + self.alpha))
+        return self.value
+
+class StreamingRSI:
+    """Relative Strength Index over simple rolling means of gains and losses"""
+
+    def __init__(self, periods=14):
+        self.gains = RollingWindow(periods)
+        self.losses = RollingWindow(periods)
+        self.prev = None
+        self.value = NAN
+
+    def update(self, price):
+        # The first bar has no delta; the batch version counts it as 0 gain/loss
+        delta = 0.0 if self.prev is None else price - self.prev
+        self.prev = price
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+
+        gain, loss = self.gains.mean(), self.losses.mean()
+        if math.isnan(gain) or math.isnan(loss) or (gain == 0 and loss == 0):
+            self.value = NAN
+        elif loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - (100 / (1 + gain / loss))
+        return self.value
+
+class StreamingMACD:
+    """MACD line and signal line"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = StreamingEWM(fast)
+        self.slow = StreamingEWM(slow)
+        self.signal_ewm = StreamingEWM(signal)
+        self.macd = NAN
+        self.signal = NAN
+
+    def update(self, price):
+        self.macd = self.fast.update(price) - self.slow.update(price)
+        self.signal = self.signal_ewm.update(self.macd)
+        return self.macd, self.signal
+
+class StreamingBollinger:
+    """Upper band, SMA and lower band"""
+
+    def __init__(self, window=20, num_std=2):
+        self.window = RollingWindow(window)
+        self.num_std = num_std
+
+    def update(self, price):
+        self.window.push(price)
+        sma = self.window.mean()
+        std = self.window.std()
+        return sma + std * self.num_std, sma, sma - std * self.num_std
+
+class StreamingSentiment:
+    """Composite sentiment score (-100 to 100), see calculate_sentiment"""
+
+    def __init__(self, rsi_periods=14, momentum_periods=10, trend_periods=5):
+        self.rsi = StreamingRSI(rsi_periods)
+        self.macd = StreamingMACD()
+        self.momentum_periods = momentum_periods
+        self.trend_periods = trend_periods
+        self.history = deque(maxlen=max(momentum_periods, trend_periods) + 1)
+        self.value = NAN
+
+    def _lagged(self, periods):
+        if len(self.history) <= periods:
+            return NAN
+        return self.history[-1 - periods]
+
+    def update(self, price):
+        self.history.append(price)
+        rsi = self.rsi.update(price)
+        macd, _ = self.macd.update(price)
+
+        rsi_score = (rsi - 50) * 0.6
+        macd_score = np.sign(macd) * np.minimum(abs(macd), 30)
+        returns = price / self._lagged(self.momentum_periods) - 1
+        momentum_score = np.sign(returns) * np.minimum(abs(returns * 1000), 20)
+        volume_score = np.sign(price - self._lagged(self.trend_periods)) * 20
+
+        sentiment = rsi_score + macd_score + momentum_score + volume_score
+        self.value = float(np.clip(sentiment, -100, 100))
+        return self.value
+
+class StreamingIndicators:
+    """
+    All indicators for one price stream. update(bar) takes a close price (or a
+    mapping/row with a 'Close/Last' entry) and returns the same keys as
+    momentum_analysis.calculate_indicators, for the newest bar only.
+    """
+
+    def __init__(self):
+        self.sentiment = StreamingSentiment()
+        self.bollinger = StreamingBollinger()
+
+    def update(self, bar):
+        price = float(bar) if isinstance(bar, numbers.Real) else float(bar['Close/Last'])
+        sentiment = self.sentiment.update(price)
+        upper_band, sma, lower_band = self.bollinger.update(price)
+        return {
+            'rsi': self.sentiment.rsi.value,
+            'macd': self.sentiment.macd.macd,
+            'signal': self.sentiment.macd.signal,
+            'upper_band': upper_band,
+            'sma': sma,
+            'lower_band': lower_band,
+            'sentiment': sentiment,
+        }
+
+    def warm_up(self, prices):
+        """Prime the state from historical closes; returns the last result"""
+        result = None
+        for price in prices:
+            result = self.update(price)
+        return result
@@ -0,0 +1,92 @@
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import momentum_analysis as ma
+
+SPY_CSV = os.path.join(os.path.dirname(HERE), 'SPY.csv')
+
+@pytest.fixture
+def universe(tmp_path):
+    """SPY as-is plus HALT: the same prices with one trading day missing"""
+    shutil.copy(SPY_CSV, tmp_path / 'SPY.csv')
+    spy = pd.read_csv(SPY_CSV)
+    # A date well inside the 3-month window, so every rolling indicator spans it
+    halt = spy.drop(index=20)
+    halt.to_csv(tmp_path / 'HALT.csv', index=False)
+    return tmp_path, spy['Date'].iloc[20]
+
+@pytest.mark.parametrize('use_cache', [False, True])
+def test_missing_date_matches_single_ticker(universe, use_cache):
+    data_dir, missing = universe
+    paths = [str(data_dir / 'SPY.csv'), str(data_dir / 'HALT.csv')]
+    close, _ = ma.load_universe(paths, use_cache=use_cache)
+    assert np.isnan(close.loc[pd.Timestamp(missing), 'HALT'])
+
+    summary, _ = ma.analyze_universe(paths, use_cache=use_cache)
+    row = summary.set_index('ticker').loc['HALT']
+
+    df = ma.load_price_data(str(data_dir / 'HALT.csv'), use_cache=use_cache)
+    alone = ma.calculate_indicators(df['Close/Last'])
+    for name in ('rsi', 'macd', 'signal', 'upper_band', 'sma', 'lower_band', 'sentiment'):
+        assert row[name] == pytest.approx(alone[name].iloc[-1]), name
+    assert row['projected_close'] == pytest.approx(ma.calculate_projections(df['Close/Last'])[-1])
+
+def test_universe_indicators_keep_gap_rows_empty(universe):
+    data_dir, missing = universe
+    close, _ = ma.load_universe([str(data_dir / 'SPY.csv'), str(data_dir / 'HALT.csv')],
+                                use_cache=False)
+    indicators = ma.calculate_universe_indicators(close)
+    # HALT has no value on the date it lacks; SPY is unaffected by HALT's gap
+    assert np.isnan(indicators['sma'].loc[pd.Timestamp(missing), 'HALT'])
+    spy_alone = ma.calculate_indicators(close['SPY'])
+    pd.testing.assert_series_equal(indicators['rsi']['SPY'], spy_alone['rsi'])
+
+def test_reused_figure_matches_fresh():
+    df = ma.load_price_data(SPY_CSV, use_cache=False)
+    close, volume = df['Close/Last'], df['Volume']
+    indicators = ma.calculate_indicators(close)
+    projections = ma.calculate_ticker_projections(close, volume, indicators)
+
+    def render(figure, ticker='SPY'):
+        fig, axes, ax2 = figure
+        ma.draw_momentum_analysis(fig, axes, ax2, close, volume, indicators, projections, ticker)
+        fig.canvas.draw()
+        return np.asarray(fig.canvas.buffer_rgba()).copy()
+
+    fresh = render(ma.create_momentum_figure(headless=True))
+    reused = ma.create_momentum_figure(headless=True)
+    render(reused, 'A MUCH LONGER TICKER NAME')
+    np.testing.assert_array_equal(render(reused), fresh)
+
+def reference_projection(column, days_to_project=7):
+    """One column the slow way: drop NaNs, fit with np.polyfit, rescale"""
+    valid = column[~np.isnan(column)]
+    if len(valid) < 2:
+        return np.full(days_to_project, column[-1])
+    slope, intercept = np.polyfit(np.arange(len(valid)), valid, 1)
+    y_future = intercept + slope * np.arange(len(column), len(column) + days_to_project)
+    return y_future * (column[-1] / y_future[0])
+
+def test_projections_batch_matches_polyfit():
+    rng = np.random.default_rng(0)
+    prices = 100 + np.cumsum(rng.normal(0, 1, size=(60, 5)), axis=0)
+    prices[[3, 17, 18, 40], 1] = np.nan      # gaps inside the series
+    prices[:25, 2] = np.nan                  # listed late
+    prices[::2, 3] = np.nan                  # every other day missing
+    prices[:-1, 4] = np.nan                  # a single point: no trend
+    frame = pd.DataFrame(prices)
+
+    batch = ma.calculate_projections_batch(frame)
+    assert batch.shape == (7, 5)
+    for j in range(prices.shape[1]):
+        np.testing.assert_allclose(batch[:, j], reference_projection(prices[:, j]),
+                                   rtol=1e-10, err_msg=f'column {j}')
+    np.testing.assert_allclose(ma.calculate_projections(frame[1]), batch[:, 1])
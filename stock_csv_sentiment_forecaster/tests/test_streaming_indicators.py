@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import momentum_analysis as ma
+from streaming_indicators import StreamingIndicators
+
+SPY_CSV = os.path.join(os.path.dirname(HERE), 'SPY.csv')
+
+# Largest absolute gap allowed against the batch functions. The rolling sums
+# are re-anchored once per window, so the bands stay within ~2e-10 over the
+# whole SPY history; the EWM recursion is the same arithmetic as pandas.
+TOLERANCE = {
+    'rsi': 1e-12,
+    'macd': 0.0,
+    'signal': 0.0,
+    'upper_band': 1e-9,
+    'sma': 1e-12,
+    'lower_band': 1e-9,
+    'sentiment': 1e-12,
+}
+
+@pytest.fixture(scope='module')
+def spy():
+    # Every row of the file, so the rolling windows re-anchor many times
+    return ma.load_price_data(SPY_CSV, months_to_show=1200, use_cache=False)
+
+@pytest.mark.parametrize('name', sorted(TOLERANCE))
+def test_bar_by_bar_matches_batch(spy, name):
+    close = spy['Close/Last']
+    stream = StreamingIndicators()
+    streamed = np.array([stream.update(bar)[name] for bar in close])
+    batch = ma.calculate_indicators(close)[name].to_numpy()
+
+    # Same warm-up: NaN on exactly the same bars
+    np.testing.assert_array_equal(np.isnan(streamed), np.isnan(batch))
+    np.testing.assert_allclose(streamed, batch, rtol=0, atol=TOLERANCE[name], equal_nan=True)
+
+def test_update_accepts_rows(spy):
+    head = spy.head(40)
+    expected = StreamingIndicators().warm_up(head['Close/Last'])
+    assert StreamingIndicators().warm_up(row for _, row in head.iterrows()) == expected